@@ -27,22 +27,24 @@ def import_from_url(url, company=None, dry_run=False):
         importer = XMLItemImporter(url, company)
 
         if dry_run:
-            # Just parse and show info
-            xml_content = importer.fetch_xml_content()
-            root = importer.parse_xml(xml_content)
-            shopitems = root.findall('.//SHOPITEM')
-
-            print(f"XML parsed successfully!")
-            print(f"Found {len(shopitems)} items")
-
-            # Show first 3 items
-            for i, item in enumerate(shopitems[:3]):
-                item_data = importer.parse_shop_item(item)
-                print(f"\nItem {i+1}:")
-                print(f"  Code: {item_data.get('item_code')}")
-                print(f"  Name: {item_data.get('name')}")
-                print(f"  Price: {item_data.get('standard_rate')} {item_data.get('currency')}")
-                print(f"  Categories: {[c.get('name') for c in item_data.get('categories', [])]}")
+            # Just parse and show info, streaming the feed
+            item_count = 0
+            with importer.open_xml_stream() as stream:
+                for item in importer.iter_shop_items(stream):
+                    item_count += 1
+
+                    # Show first 3 items
+                    if item_count > 3:
+                        continue
+                    item_data = importer.parse_shop_item(item)
+                    print(f"\nItem {item_count}:")
+                    print(f"  Code: {item_data.get('item_code')}")
+                    print(f"  Name: {item_data.get('name')}")
+                    print(f"  Price: {item_data.get('standard_rate')} {item_data.get('currency')}")
+                    print(f"  Categories: {[c.get('name') for c in item_data.get('categories', [])]}")
+
+            print(f"\nXML parsed successfully!")
+            print(f"Found {item_count} items")
         else:
             # Actual import
             result = importer.import_from_xml()
@@ -79,18 +81,21 @@ def test_xml_parsing(file_path):
         print("-" * 50)
 
         importer = XMLItemImporter(file_path)
-        xml_content = importer.fetch_xml_content()
-        root = importer.parse_xml(xml_content)
 
-        # Find all SHOPITEM elements
-        shopitems = root.findall('.//SHOPITEM')
+        # Count SHOPITEM elements while streaming, keeping the first one parsed
+        item_count = 0
+        item_data = None
+        with importer.open_xml_stream() as stream:
+            for shopitem in importer.iter_shop_items(stream):
+                if not item_count:
+                    item_data = importer.parse_shop_item(shopitem)
+                item_count += 1
 
-        print(f"Root element: {root.tag}")
-        print(f"Found {len(shopitems)} SHOPITEM elements")
+        print(f"Root element: {importer.feed_root_tag}")
+        print(f"Found {item_count} SHOPITEM elements")
 
-        if shopitems:
+        if item_data:
             print("\nFirst item details:")
-            item_data = importer.parse_shop_item(shopitems[0])
 
             for key, value in item_data.items():
                 if isinstance(value, list) and value:
@@ -33,7 +33,7 @@ class XMLImportConfiguration(Document):
 				)
 			elif self.import_type == "Orders":
 				from xml_importer.xml_importer.order_importer import import_xml_orders
-				result = import_xml_orders(self.xml_feed_url, self.company)
+				result = import_xml_orders(self.xml_feed_url, self.company, config=self)
 
 				# Create import log
 				from xml_importer.xml_importer.doctype.xml_import_log.xml_import_log import create_order_import_log
@@ -82,7 +82,8 @@ class XMLImportConfiguration(Document):
 
 				response = requests.get(self.xml_feed_url, timeout=30)
 				response.raise_for_status()
-				content = response.text
+				# Raw bytes, decoded once by the parser according to the XML declaration
+				content = response.content
 				content_length = len(content)
 
 				# Log this attempt
@@ -109,7 +110,8 @@ class XMLImportConfiguration(Document):
 							frappe.logger().info(f"Found {order_count} orders on attempt {attempt}, triggering import")
 
 							# Save the content for debugging
-							frappe.log_error(f"Orders found on attempt {attempt}: {content[:1000]}", "Aggressive Import Success")
+							if frappe.conf.get('xml_importer_debug'):
+								frappe.log_error(f"Orders found on attempt {attempt}: {content[:1000].decode('utf-8', 'replace')}", "Aggressive Import Success")
 
 							# Trigger import
 							import_result = self.trigger_manual_import()
@@ -243,7 +245,8 @@ class XMLImportConfiguration(Document):
 
 			# Try to parse XML
 			try:
-				root = ET.fromstring(xml_content)
+				# Parse the raw bytes rather than re-encoding the decoded text
+				root = ET.fromstring(response.content)
 				root_tag = root.tag
 				root_attributes = dict(root.attrib) if root.attrib else {}
 
@@ -369,7 +372,9 @@ class XMLImportConfiguration(Document):
 		if not self.enabled:
 			frappe.throw("XML Import is not enabled. Please enable it first.")
 
-		if not xml_content or not xml_content.strip():
+		# Stripped once, for both the emptiness check and parsing
+		stripped_content = xml_content.strip() if xml_content else ""
+		if not stripped_content:
 			frappe.throw("XML Content is required")
 
 		try:
@@ -377,7 +382,7 @@ class XMLImportConfiguration(Document):
 
 			# Parse the XML to validate it
 			try:
-				root = ET.fromstring(xml_content.strip())
+				root = ET.fromstring(stripped_content)
 				xml_valid = True
 				root_tag = root.tag
 				parse_error = None
@@ -429,22 +434,15 @@ class XMLImportConfiguration(Document):
 					})
 
 			elif self.import_type == "Orders":
-				# Look for order elements - try multiple possible names
-				elements = (root.findall('.//order') or
-						   root.findall('.//Order') or
-						   root.findall('.//ORDER') or
-						   root.findall('.//objednavka') or  # Slovak for order
-						   root.findall('.//OBJEDNAVKA'))
+				from xml_importer.xml_importer.order_importer import XMLOrderImporter
 
-				# If still no elements found and root is ORDERS, check direct children
-				if not elements and root.tag.upper() == 'ORDERS':
-					elements = [child for child in root if child.tag.lower() in ['order', 'objednavka'] or 'order' in child.tag.lower()]
+				# Look for order elements - <order>, <ORDER>, <objednavka>, ...
+				elements = XMLOrderImporter.find_order_elements(root)
 
 				result["element_count"] = len(elements)
 
 				if elements:
 					# Process orders import
-					from xml_importer.xml_importer.order_importer import XMLOrderImporter
 					importer = XMLOrderImporter(company=self.company, config=self)
 					import_result = importer.process_xml_content(xml_content)
 
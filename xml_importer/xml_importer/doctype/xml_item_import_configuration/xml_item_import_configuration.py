@@ -21,7 +21,7 @@ class XMLItemImportConfiguration(Document):
 				result = import_xml_items(self.xml_feed_url, self.company)
 			elif self.import_type == "Orders":
 				from xml_importer.xml_importer.order_importer import import_xml_orders
-				result = import_xml_orders(self.xml_feed_url, self.company)
+				result = import_xml_orders(self.xml_feed_url, self.company, config=self)
 			else:
 				frappe.throw(f"Import type '{self.import_type}' is not yet implemented")
 
@@ -28,16 +28,15 @@ class XMLItemImportSettings(Document):
 
 		try:
 			importer = XMLItemImporter(self.xml_feed_url, self.company)
-			xml_content = importer.fetch_xml_content()
-			root = importer.parse_xml(xml_content)
 
-			# Count items
-			shopitems = root.findall('.//SHOPITEM')
+			# Count items while streaming, without building the whole tree
+			with importer.open_xml_stream() as stream:
+				item_count = sum(1 for _ in importer.iter_shop_items(stream))
 
 			return {
 				"success": True,
-				"message": f"Connection successful! Found {len(shopitems)} items in XML feed.",
-				"item_count": len(shopitems)
+				"message": f"Connection successful! Found {item_count} items in XML feed.",
+				"item_count": item_count
 			}
 
 		except Exception as e:
@@ -39,16 +39,14 @@ class XMLOrderImportSettings(Document):
 
 		try:
 			importer = XMLOrderImporter(self.xml_feed_url, self.company)
-			xml_content = importer.fetch_xml_content()
-			root = importer.parse_xml(xml_content)
-
 			# Count orders
-			orders = root.findall('.//ORDER')
+			with importer.open_xml_stream() as stream:
+				order_count = sum(1 for _ in importer.iter_orders(stream))
 
 			return {
 				"success": True,
-				"message": f"Connection successful! Found {len(orders)} orders in XML feed.",
-				"order_count": len(orders)
+				"message": f"Connection successful! Found {order_count} orders in XML feed.",
+				"order_count": order_count
 			}
 
 		except Exception as e:
@@ -71,7 +69,7 @@ class XMLOrderImportSettings(Document):
 
 		try:
 			# Run the import
-			result = import_xml_orders(self.xml_feed_url, self.company)
+			result = import_xml_orders(self.xml_feed_url, self.company, config=self)
 
 			# Update last import status
 			self.db_set("last_import", frappe.utils.now())
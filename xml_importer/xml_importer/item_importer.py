@@ -7,15 +7,83 @@ License: MIT
 """
 
 import frappe
+import logging
 import requests
+from requests.adapters import HTTPAdapter
 import xml.etree.ElementTree as ET
 from frappe.model.document import Document
 from frappe.utils import now, cstr, flt, cint, strip_html_tags
 from frappe.utils.file_manager import save_file
 import re
 import os
+import io
 from urllib.parse import urlparse
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, BinaryIO, Iterator, Tuple
+from datetime import timedelta
+
+try:
+    # libxml2 streams large feeds considerably faster than the pure ElementTree parser
+    from lxml import etree as LET
+    # Allow very large feeds and never expand entities
+    XML_PARSER_OPTIONS = {"huge_tree": True, "resolve_entities": False}
+    XML_PARSE_ERRORS = (ET.ParseError, LET.ParseError)
+    LXML_AVAILABLE = True
+except ImportError:
+    XML_PARSER_OPTIONS = {}
+    XML_PARSE_ERRORS = (ET.ParseError,)
+    LXML_AVAILABLE = False
+
+
+def index_children(parent) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """Map each child tag to its stripped text and to its element in a single pass (first occurrence wins)"""
+    texts = {}
+    children = {}
+    for child in parent:
+        tag = child.tag
+        if tag not in children:
+            children[tag] = child
+            texts[tag] = child.text.strip() if child.text else ""
+    return texts, children
+
+# Normalized (casefolded) title of the wholesale price list in the XML feed
+WHOLESALE_PRICE_LIST_KEY = 'veľkoobchod'
+
+# Log progress at INFO level once every N items
+LOG_MILESTONE_INTERVAL = 100
+
+# Publish realtime progress once every N items
+PROGRESS_INTERVAL = 50
+
+# Most error messages kept per import; error_count counts all
+MAX_COLLECTED_ERRORS = 100
+
+# Bytes that may precede the root element of a feed that is otherwise empty
+XML_BLANK_BYTES = b' \t\r\n\xef\xbb\xbf'
+
+# Patterns used by clean_html_content, clean_name and category tags
+CDATA_RE = re.compile(r'<!\[CDATA\[(.*?)\]\]>', re.DOTALL)
+WHITESPACE_RE = re.compile(r'\s+')
+NAME_INVALID_CHARS_RE = re.compile(r'[<>&"\']')
+TAG_INVALID_CHARS_RE = re.compile(r'[^\w\s-]')
+
+# Separator between addresses in notification recipient lists
+RECIPIENT_SPLIT_RE = re.compile(r'\s*,\s*')
+
+# Import frequency options mapped to minutes between imports
+IMPORT_FREQUENCY_MINUTES = {
+    "Every 5 Minutes": 5,
+    "Every 10 Minutes": 10,
+    "Every 15 Minutes": 15,
+    "Every 30 Minutes": 30,
+    "Hourly": 60,
+    "Every 2 Hours": 120,
+    "Every 6 Hours": 360,
+    "Daily": 1440,
+    "Weekly": 10080
+}
+IMPORT_FREQUENCY_DELTAS = {
+    frequency: timedelta(minutes=minutes) for frequency, minutes in IMPORT_FREQUENCY_MINUTES.items()
+}
 
 class XMLItemImporter:
     """Import items from XML feed into ERPNext"""
@@ -36,6 +104,18 @@ class XMLItemImporter:
         self.updated_count = 0
         self.error_count = 0
         self.errors = []
+        self._log = frappe.logger()
+
+        # Reuse TCP/TLS connections across image downloads
+        self._http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+        self._http.mount('http://', adapter)
+        self._http.mount('https://', adapter)
+
+        # Size of the feed in bytes, when known, for progress reporting
+        self.feed_size = None
+        # Tag of the feed's root element, set once streaming starts
+        self.feed_root_tag = None
 
         # Initialize required UOMs and custom fields
         self.ensure_required_uoms()
@@ -54,7 +134,7 @@ class XMLItemImporter:
         ]
 
         for uom_data in required_uoms:
-            if not frappe.db.exists("UOM", uom_data["uom_name"]):
+            if not frappe.get_cached_value("UOM", uom_data["uom_name"], "name"):
                 try:
                     uom_doc = frappe.get_doc({
                         "doctype": "UOM",
@@ -65,46 +145,112 @@ class XMLItemImporter:
                 except Exception as e:
                     frappe.log_error(f"Failed to create UOM {uom_data['uom_name']}: {str(e)}")
 
-    def fetch_xml_content(self) -> str:
-        """Fetch XML content from URL or file"""
+    def open_xml_stream(self, response: Optional[requests.Response] = None) -> BinaryIO:
+        """
+        Open the XML source (URL or file) as a binary stream for incremental parsing
+
+        A response already fetched with stream=True (e.g. by a conditional GET)
+        is read directly instead of requesting the URL again.
+        """
         try:
-            if self.xml_source.startswith(('http://', 'https://')):
-                # Fetch from URL
-                response = requests.get(self.xml_source, timeout=60)
+            if response is None and self.xml_source.startswith(('http://', 'https://')):
+                # Stream from URL without buffering the whole body
+                response = self._http.get(self.xml_source, stream=True, timeout=60)
                 response.raise_for_status()
-                return response.text
+
+            if response is not None:
+                response.raw.decode_content = True
+                self.feed_size = cint(response.headers.get('Content-Length')) or None
+                return response.raw
             else:
                 # Read from file
-                with open(self.xml_source, 'r', encoding='utf-8') as f:
-                    return f.read()
+                self.feed_size = os.path.getsize(self.xml_source) or None
+                return open(self.xml_source, 'rb')
         except Exception as e:
             frappe.throw(f"Failed to fetch XML content: {str(e)}")
 
-    def parse_xml(self, xml_content: str) -> ET.Element:
-        """Parse XML content"""
-        try:
-            # Remove any BOM and clean content
-            if xml_content.startswith('\ufeff'):
-                xml_content = xml_content[1:]
+    def iter_shop_items(self, stream: BinaryIO) -> Iterator[ET.Element]:
+        """
+        Yield SHOPITEM elements one at a time from a binary XML stream
+
+        Each element is cleared and detached from its parent once the caller is
+        done with it, so memory use is bounded by a single item. An empty feed
+        yields no items.
+        """
+        if not hasattr(stream, 'peek'):
+            stream = io.BufferedReader(stream)
+
+        # Drop leading blank bytes; nothing left means there is no root element to parse
+        head = stream.peek(1)
+        while head and not head.lstrip(XML_BLANK_BYTES):
+            stream.read(len(head))
+            head = stream.peek(1)
+        if not head:
+            return
 
-            root = ET.fromstring(xml_content)
-            return root
-        except ET.ParseError as e:
-            frappe.throw(f"XML parsing failed: {str(e)}")
+        if LXML_AVAILABLE:
+            # libxml2 filters on the tag itself, so only SHOPITEM end events reach Python
+            context = LET.iterparse(stream, events=('end',), tag='SHOPITEM', **XML_PARSER_OPTIONS)
+            for _, elem in context:
+                if self.feed_root_tag is None:
+                    self.feed_root_tag = elem.getroottree().getroot().tag
+                yield elem
+                elem.clear()
+                # Drop this and any earlier siblings already handed out
+                parent = elem.getparent()
+                if parent is not None:
+                    while elem.getprevious() is not None:
+                        del parent[0]
+                    parent.remove(elem)
+
+            if context.root is not None:
+                self.feed_root_tag = context.root.tag
+            return
+
+        # Open elements, tracked so processed items can be removed from their parent
+        open_elements = []
+        for event, elem in ET.iterparse(stream, events=('start', 'end')):
+            if event == 'start':
+                if not open_elements and self.feed_root_tag is None:
+                    self.feed_root_tag = elem.tag
+                open_elements.append(elem)
+                continue
+
+            open_elements.pop()
+            if elem.tag != 'SHOPITEM':
+                continue
+
+            yield elem
+            elem.clear()
+            if open_elements:
+                open_elements[-1].remove(elem)
+
+    def get_stream_progress(self, stream: BinaryIO) -> Optional[float]:
+        """Percentage of the feed read so far, when its size is known"""
+        if not self.feed_size:
+            return None
+        try:
+            return min(100.0, stream.tell() * 100 / self.feed_size)
+        except (AttributeError, OSError):
+            return None
 
     def clean_html_content(self, content: str) -> str:
         """Clean HTML content and extract text"""
         if not content:
             return ""
 
+        # Plain text has no CDATA or tags to strip
+        if '<' not in content:
+            return WHITESPACE_RE.sub(' ', content).strip()
+
         # Remove CDATA
-        content = re.sub(r'<!\[CDATA\[(.*?)\]\]>', r'\1', content, flags=re.DOTALL)
+        content = CDATA_RE.sub(r'\1', content)
 
         # Strip HTML tags but preserve line breaks
         content = strip_html_tags(content)
 
         # Clean up extra whitespace
-        content = re.sub(r'\s+', ' ', content).strip()
+        content = WHITESPACE_RE.sub(' ', content).strip()
 
         return content
 
@@ -113,14 +259,15 @@ class XMLItemImporter:
         if not name:
             return ""
 
-        # Remove HTML tags first
-        name = strip_html_tags(name)
+        # Remove HTML tags first (only possible when the name contains a '<')
+        if '<' in name:
+            name = strip_html_tags(name)
 
         # Remove special characters that ERPNext doesn't allow in names
-        name = re.sub(r'[<>&"\']', '', name)
+        name = NAME_INVALID_CHARS_RE.sub('', name)
 
         # Replace multiple spaces with single space
-        name = re.sub(r'\s+', ' ', name)
+        name = WHITESPACE_RE.sub(' ', name)
 
         # Trim and return
         return name.strip()
@@ -153,7 +300,7 @@ class XMLItemImporter:
             return mapped_unit
 
         # Check if UOM exists in ERPNext
-        if frappe.db.exists("UOM", unit_code):
+        if frappe.get_cached_value("UOM", unit_code, "name"):
             return unit_code
 
         # Create new UOM if it doesn't exist
@@ -176,7 +323,7 @@ class XMLItemImporter:
 
         try:
             # Download image
-            response = requests.get(image_url, timeout=30)
+            response = self._http.get(image_url, timeout=30)
             response.raise_for_status()
 
             # Get file extension from URL
@@ -229,7 +376,7 @@ class XMLItemImporter:
             # Skip if name is empty after cleaning
             if not category_name:
                 continue            # Check if Item Group exists, create if not
-            if not frappe.db.exists("Item Group", category_name):
+            if not frappe.get_cached_value("Item Group", category_name, "name"):
                 try:
                     item_group = frappe.get_doc({
                         "doctype": "Item Group",
@@ -254,7 +401,7 @@ class XMLItemImporter:
 
         category_name = self.clean_name(category_name.strip())
 
-        if not frappe.db.exists("Item Group", category_name):
+        if not frappe.get_cached_value("Item Group", category_name, "name"):
             try:
                 item_group = frappe.get_doc({
                     "doctype": "Item Group",
@@ -263,7 +410,7 @@ class XMLItemImporter:
                     "is_group": 0
                 })
                 item_group.insert(ignore_permissions=True)
-                frappe.logger().info(f"Created Item Group: {category_name}")
+                self._log.info(f"Created Item Group: {category_name}")
             except Exception as e:
                 frappe.log_error(f"Failed to create Item Group {category_name}: {str(e)}")
                 return "All Item Groups"
@@ -277,14 +424,14 @@ class XMLItemImporter:
 
         brand_name = self.clean_name(brand_name.strip())
 
-        if not frappe.db.exists("Brand", brand_name):
+        if not frappe.get_cached_value("Brand", brand_name, "name"):
             try:
                 brand = frappe.get_doc({
                     "doctype": "Brand",
                     "brand": brand_name
                 })
                 brand.insert(ignore_permissions=True)
-                frappe.logger().info(f"Created Brand: {brand_name}")
+                self._log.info(f"Created Brand: {brand_name}")
             except Exception as e:
                 frappe.log_error(f"Failed to create Brand {brand_name}: {str(e)}")
                 return None
@@ -298,7 +445,7 @@ class XMLItemImporter:
 
         supplier_name = self.clean_name(supplier_name.strip())
 
-        if not frappe.db.exists("Supplier", supplier_name):
+        if not frappe.get_cached_value("Supplier", supplier_name, "name"):
             try:
                 supplier = frappe.get_doc({
                     "doctype": "Supplier",
@@ -307,7 +454,7 @@ class XMLItemImporter:
                     "supplier_type": "Company"
                 })
                 supplier.insert(ignore_permissions=True)
-                frappe.logger().info(f"Created Supplier: {supplier_name}")
+                self._log.info(f"Created Supplier: {supplier_name}")
             except Exception as e:
                 frappe.log_error(f"Failed to create Supplier {supplier_name}: {str(e)}")
                 return None
@@ -329,7 +476,7 @@ class XMLItemImporter:
         )
 
         if existing_barcode:
-            frappe.logger().info(f"Barcode {barcode_value} already exists, skipping for item {item_doc.item_code}")
+            self._log.debug(f"Barcode {barcode_value} already exists, skipping for item {item_doc.item_code}")
             return
 
         try:
@@ -338,7 +485,7 @@ class XMLItemImporter:
                 "barcode": barcode_value,
                 "barcode_type": "EAN"
             })
-            frappe.logger().info(f"Added EAN barcode {barcode_value} to item {item_doc.item_code}")
+            self._log.debug(f"Added EAN barcode {barcode_value} to item {item_doc.item_code}")
         except Exception as e:
             frappe.log_error(f"Failed to add barcode {barcode_value} to item {item_doc.item_code}: {str(e)}")
 
@@ -354,7 +501,7 @@ class XMLItemImporter:
 
         # Accept EAN-8, EAN-13, UPC-A (12 digits), or other common lengths
         if len(barcode) not in [8, 12, 13, 14]:
-            frappe.logger().warning(f"Barcode '{barcode}' has invalid length {len(barcode)}")
+            self._log.warning(f"Barcode '{barcode}' has invalid length {len(barcode)}")
             return False
 
         return True
@@ -376,9 +523,9 @@ class XMLItemImporter:
                     "item_tax_template": tax_template,
                     "tax_category": ""  # Default tax category
                 })
-                frappe.logger().info(f"Set Item Tax Template '{tax_template}' ({tax_rate}%) for item {item_doc.item_code}")
+                self._log.debug(f"Set Item Tax Template '{tax_template}' ({tax_rate}%) for item {item_doc.item_code}")
             else:
-                frappe.logger().warning(f"Could not create/find tax template for {tax_rate}% - item {item_doc.item_code}")
+                self._log.warning(f"Could not create/find tax template for {tax_rate}% - item {item_doc.item_code}")
 
             # Also store in custom fields if available (for reference)
             if hasattr(item_doc, 'tax_rate'):
@@ -415,18 +562,18 @@ class XMLItemImporter:
             template_name = f"{template_title} - {company_abbr}"
 
             # Check if template already exists
-            if frappe.db.exists("Item Tax Template", template_name):
-                frappe.logger().debug(f"Using existing Item Tax Template: {template_name}")
+            if frappe.get_cached_value("Item Tax Template", template_name, "name"):
+                self._log.debug(f"Using existing Item Tax Template: {template_name}")
                 return template_name
 
             # Get or identify the VAT account
             vat_account = self.get_vat_account()
             if not vat_account:
-                frappe.logger().error(f"No VAT account found for company {self.company}")
+                self._log.error(f"No VAT account found for company {self.company}")
                 return None
 
             # Create new Item Tax Template
-            frappe.logger().info(f"Creating new Item Tax Template: {template_name}")
+            self._log.info(f"Creating new Item Tax Template: {template_name}")
 
             tax_template = frappe.get_doc({
                 "doctype": "Item Tax Template",
@@ -443,7 +590,7 @@ class XMLItemImporter:
             tax_template.insert(ignore_permissions=True)
             frappe.db.commit()
 
-            frappe.logger().info(f"Created Item Tax Template: {template_name} with rate {tax_rate}%")
+            self._log.info(f"Created Item Tax Template: {template_name} with rate {tax_rate}%")
             return template_name
 
         except Exception as e:
@@ -508,13 +655,13 @@ class XMLItemImporter:
             )
 
             if vat_account:
-                frappe.logger().warning(
+                self._log.warning(
                     f"Using generic Tax account {vat_account} - consider creating specific VAT account"
                 )
                 return vat_account
 
             # No tax account found
-            frappe.logger().error(
+            self._log.error(
                 f"No Tax account found for company {self.company}. "
                 "Please create a Tax account (e.g., 'VAT - {abbr}') in Chart of Accounts."
             )
@@ -598,16 +745,17 @@ class XMLItemImporter:
                         'item_group': category_name
                     })
 
-            if unique_additional_categories:
-                frappe.logger().info(
-                    f"Item {item_doc.item_code}: Primary category = '{default_category or item_doc.item_group}', "
-                    f"Additional categories = {unique_additional_categories}"
-                )
-            else:
-                frappe.logger().info(
-                    f"Item {item_doc.item_code}: Primary category = '{default_category or item_doc.item_group}', "
-                    f"No additional categories"
-                )
+            if self._log.isEnabledFor(logging.DEBUG):
+                if unique_additional_categories:
+                    self._log.debug(
+                        f"Item {item_doc.item_code}: Primary category = '{default_category or item_doc.item_group}', "
+                        f"Additional categories = {unique_additional_categories}"
+                    )
+                else:
+                    self._log.debug(
+                        f"Item {item_doc.item_code}: Primary category = '{default_category or item_doc.item_group}', "
+                        f"No additional categories"
+                    )
 
         except Exception as e:
             frappe.log_error(f"Failed to handle categories for item {item_doc.item_code}: {str(e)}")
@@ -622,7 +770,7 @@ class XMLItemImporter:
 
             # Check if custom field already exists
             if frappe.db.exists("Custom Field", {"dt": "Item", "fieldname": custom_field_name}):
-                frappe.logger().debug(f"Custom field '{custom_field_name}' already exists on Item")
+                self._log.debug(f"Custom field '{custom_field_name}' already exists on Item")
                 return
 
             # Create the custom field
@@ -642,7 +790,7 @@ class XMLItemImporter:
             custom_field.insert(ignore_permissions=True)
             frappe.db.commit()
 
-            frappe.logger().info(f"Created custom field '{custom_field_name}' on Item doctype")
+            self._log.info(f"Created custom field '{custom_field_name}' on Item doctype")
 
         except Exception as e:
             # If field creation fails, log it but don't stop the import
@@ -662,7 +810,7 @@ class XMLItemImporter:
 
             # Check if custom field already exists
             if frappe.db.exists("Custom Field", {"dt": "Item", "fieldname": custom_field_name}):
-                frappe.logger().debug(f"Custom field '{custom_field_name}' already exists on Item")
+                self._log.debug(f"Custom field '{custom_field_name}' already exists on Item")
                 return
 
             # Create the custom field
@@ -682,7 +830,7 @@ class XMLItemImporter:
             custom_field.insert(ignore_permissions=True)
             frappe.db.commit()
 
-            frappe.logger().info(f"Created custom field '{custom_field_name}' on Item doctype")
+            self._log.info(f"Created custom field '{custom_field_name}' on Item doctype")
 
         except Exception as e:
             # If field creation fails, log it but don't stop the import
@@ -724,7 +872,7 @@ class XMLItemImporter:
                     category_name = category.get('category_name', '').strip()
                     if category_name:
                         # Clean category name for use as tag
-                        tag_name = re.sub(r'[^\w\s-]', '', category_name).strip()
+                        tag_name = TAG_INVALID_CHARS_RE.sub('', category_name).strip()
                         if tag_name:
                             tags.append(tag_name)
 
@@ -736,94 +884,63 @@ class XMLItemImporter:
                         except:
                             pass  # Tag might already exist
 
-            frappe.logger().info(f"Created category links for item {item_code}")
+            self._log.debug(f"Created category links for item {item_code}")
 
         except Exception as e:
             frappe.log_error(f"Failed to create category links for item {item_code}: {str(e)}")
 
     def parse_shop_item(self, shopitem: ET.Element) -> Dict[str, Any]:
         """Parse SHOPITEM XML element to dictionary with English property names"""
-        item_data = {}
-
-        # Basic information
-        item_data['external_id'] = shopitem.get('id', '')
-        item_data['import_code'] = shopitem.get('import-code', '')
-        item_data['item_name'] = self.get_element_text(shopitem, 'NAME')
-        item_data['guid'] = self.get_element_text(shopitem, 'GUID')
+        # Index direct children once instead of scanning them for every field
+        texts, children = index_children(shopitem)
+        text = texts.get
 
         # Get item code from CODE tag, fallback to id attribute if CODE is empty
-        item_code = self.get_element_text(shopitem, 'CODE')
+        item_code = text('CODE', '')
         if not item_code or not item_code.strip():
             item_code = shopitem.get('id', '')
-        item_data['item_code'] = item_code
-
-        item_data['barcode'] = self.get_element_text(shopitem, 'EAN')
-
-        # Descriptions
-        # DESCRIPTION -> main description field
-        # SHORT_DESCRIPTION -> custom field (Text Editor)
-        item_data['description'] = self.clean_html_content(
-            self.get_element_text(shopitem, 'DESCRIPTION')
-        )
-        item_data['short_description'] = self.clean_html_content(
-            self.get_element_text(shopitem, 'SHORT_DESCRIPTION')
-        )
-
-        # Supplier and manufacturer
-        item_data['manufacturer_name'] = self.get_element_text(shopitem, 'MANUFACTURER')
-        item_data['supplier_name'] = self.get_element_text(shopitem, 'SUPPLIER')
 
         # Pricing information
-        item_data['currency_code'] = self.get_element_text(shopitem, 'CURRENCY')
-        item_data['selling_price_with_tax'] = flt(self.get_element_text(shopitem, 'PRICE_VAT'))
-        item_data['purchase_price'] = flt(self.get_element_text(shopitem, 'PURCHASE_PRICE'))
-        item_data['tax_rate'] = flt(self.get_element_text(shopitem, 'VAT'))
+        price_vat = flt(text('PRICE_VAT', ''))
+        vat_rate = flt(text('VAT', ''))
 
         # Calculate tax value from VAT rate and PRICE_VAT
-        price_vat = flt(self.get_element_text(shopitem, 'PRICE_VAT'))
-        vat_rate = flt(self.get_element_text(shopitem, 'VAT'))
+        tax_amount = None
+        base_price = None
         if price_vat > 0 and vat_rate > 0:
             # Calculate base price without tax and tax amount
             base_price = price_vat / (1 + vat_rate / 100)
             tax_amount = price_vat - base_price
-            item_data['tax_amount'] = tax_amount
-            item_data['price_without_tax'] = base_price
 
         # Wholesale price from <PRICELISTS><PRICELIST><TITLE>Veľkoobchod</TITLE><PRICE_VAT>...</PRICE_VAT></PRICELIST></PRICELISTS>
         wholesale_price = None
-        pricelists_elem = shopitem.find('PRICELISTS')
+        pricelists_elem = children.get('PRICELISTS')
         if pricelists_elem is not None:
             for pricelist in pricelists_elem.findall('PRICELIST'):
-                title = self.get_element_text(pricelist, 'TITLE')
-                if title.strip().lower() == 'veľkoobchod':
-                    price_vat = self.get_element_text(pricelist, 'PRICE_VAT')
-                    if price_vat:
-                        wholesale_price = flt(price_vat)
+                # get_element_text already strips the title
+                if self.get_element_text(pricelist, 'TITLE').casefold() == WHOLESALE_PRICE_LIST_KEY:
+                    wholesale_price_vat = self.get_element_text(pricelist, 'PRICE_VAT')
+                    if wholesale_price_vat:
+                        wholesale_price = flt(wholesale_price_vat)
                         break
-        item_data['wholesale_price'] = wholesale_price
 
         # Stock information
-        stock_elem = shopitem.find('STOCK')
+        current_stock = minimum_stock = maximum_stock = None
+        stock_elem = children.get('STOCK')
         if stock_elem is not None:
-            item_data['current_stock'] = flt(self.get_element_text(stock_elem, 'AMOUNT'))
-            item_data['minimum_stock'] = flt(self.get_element_text(stock_elem, 'MINIMAL_AMOUNT'))
-            item_data['maximum_stock'] = flt(self.get_element_text(stock_elem, 'MAXIMAL_AMOUNT'))
+            current_stock = flt(self.get_element_text(stock_elem, 'AMOUNT'))
+            minimum_stock = flt(self.get_element_text(stock_elem, 'MINIMAL_AMOUNT'))
+            maximum_stock = flt(self.get_element_text(stock_elem, 'MAXIMAL_AMOUNT'))
 
         # Physical properties
-        logistics_elem = shopitem.find('LOGISTIC')
+        weight_kg = None
+        logistics_elem = children.get('LOGISTIC')
         if logistics_elem is not None:
-            item_data['weight_kg'] = flt(self.get_element_text(logistics_elem, 'WEIGHT'))
-
-        # Unit of measure
-        item_data['unit_of_measure'] = self.get_element_text(shopitem, 'UNIT') or 'Nos'
-
-        # Visibility and classification
-        item_data['is_published'] = cint(self.get_element_text(shopitem, 'VISIBLE'))
-        item_data['product_type'] = self.get_element_text(shopitem, 'ITEM_TYPE')
+            weight_kg = flt(self.get_element_text(logistics_elem, 'WEIGHT'))
 
         # Product categories
         product_categories = []
-        categories_elem = shopitem.find('CATEGORIES')
+        categories_elem = children.get('CATEGORIES')
         if categories_elem is not None:
             for category in categories_elem.findall('CATEGORY'):
                 product_categories.append({
@@ -831,14 +948,9 @@ class XMLItemImporter:
                     'category_name': category.text.strip() if category.text else ''
                 })
 
-        item_data['product_categories'] = product_categories
-
-        # Default category (primary category for item group)
-        item_data['default_category'] = self.get_element_text(shopitem, 'DEFAULT_CATEGORY')
-
         # Product images
         product_images = []
-        images_elem = shopitem.find('IMAGES')
+        images_elem = children.get('IMAGES')
         if images_elem is not None:
             for image in images_elem.findall('IMAGE'):
                 product_images.append({
@@ -846,11 +958,9 @@ class XMLItemImporter:
                     'image_description': image.get('description', '')
                 })
 
-        item_data['product_images'] = product_images
-
         # Custom attributes
         custom_attributes = []
-        text_props_elem = shopitem.find('TEXT_PROPERTIES')
+        text_props_elem = children.get('TEXT_PROPERTIES')
         if text_props_elem is not None:
             for prop in text_props_elem.findall('TEXT_PROPERTY'):
                 attribute_name = self.get_element_text(prop, 'NAME')
@@ -862,23 +972,70 @@ class XMLItemImporter:
                         'attribute_description': self.get_element_text(prop, 'DESCRIPTION')
                     })
 
-        item_data['custom_attributes'] = custom_attributes
-
         # Related product codes
         related_product_codes = []
-        related_elem = shopitem.find('RELATED_PRODUCTS')
+        related_elem = children.get('RELATED_PRODUCTS')
         if related_elem is not None:
             for code in related_elem.findall('CODE'):
                 if code.text:
                     related_product_codes.append(code.text.strip())
 
-        item_data['related_product_codes'] = related_product_codes
-
-        # SEO metadata
-        item_data['seo_page_title'] = self.get_element_text(shopitem, 'SEO_TITLE')
-        item_data['seo_meta_description'] = self.get_element_text(shopitem, 'META_DESCRIPTION')
-
-        return item_data
+        # Optional values (stock, weight, tax split) are None when missing from the feed
+        return {
+            # Basic information
+            'external_id': shopitem.get('id', ''),
+            'import_code': shopitem.get('import-code', ''),
+            'item_name': text('NAME', ''),
+            'guid': text('GUID', ''),
+            'item_code': item_code,
+            'barcode': text('EAN', ''),
+
+            # Descriptions
+            # DESCRIPTION -> main description field
+            # SHORT_DESCRIPTION -> custom field (Text Editor)
+            'description': self.clean_html_content(text('DESCRIPTION', '')),
+            'short_description': self.clean_html_content(text('SHORT_DESCRIPTION', '')),
+
+            # Supplier and manufacturer
+            'manufacturer_name': text('MANUFACTURER', ''),
+            'supplier_name': text('SUPPLIER', ''),
+
+            # Pricing information
+            'currency_code': text('CURRENCY', ''),
+            'selling_price_with_tax': price_vat,
+            'purchase_price': flt(text('PURCHASE_PRICE', '')),
+            'tax_rate': vat_rate,
+            'tax_amount': tax_amount,
+            'price_without_tax': base_price,
+            'wholesale_price': wholesale_price,
+
+            # Stock information
+            'current_stock': current_stock,
+            'minimum_stock': minimum_stock,
+            'maximum_stock': maximum_stock,
+
+            # Physical properties
+            'weight_kg': weight_kg,
+
+            # Unit of measure
+            'unit_of_measure': text('UNIT', '') or 'Nos',
+
+            # Visibility and classification
+            'is_published': cint(text('VISIBLE', '')),
+            'product_type': text('ITEM_TYPE', ''),
+
+            # Categories, default category (primary category for item group) and images
+            'product_categories': product_categories,
+            'default_category': text('DEFAULT_CATEGORY', ''),
+            'product_images': product_images,
+
+            'custom_attributes': custom_attributes,
+            'related_product_codes': related_product_codes,
+
+            # SEO metadata
+            'seo_page_title': text('SEO_TITLE', ''),
+            'seo_meta_description': text('META_DESCRIPTION', '')
+        }
 
     def get_element_text(self, parent: ET.Element, tag_name: str) -> str:
         """Get text content of XML element"""
@@ -961,9 +1118,9 @@ class XMLItemImporter:
                         existing_item.append('supplier_items', {
                             'supplier': supplier
                         })
-                        frappe.logger().info(f"Added supplier '{supplier}' to item {item_code}")
+                        self._log.debug(f"Added supplier '{supplier}' to item {item_code}")
                     else:
-                        frappe.logger().debug(f"Supplier '{supplier}' already linked to item {item_code}")
+                        self._log.debug(f"Supplier '{supplier}' already linked to item {item_code}")
 
             # Set standard buying price (purchase price)
             purchase_price = flt(item_data.get('purchase_price'))
@@ -1007,11 +1164,11 @@ class XMLItemImporter:
                                 "barcode": new_barcode,
                                 "barcode_type": "EAN"
                             })
-                            frappe.logger().info(f"Updated EAN barcode to {new_barcode} for item {item_code}")
+                            self._log.debug(f"Updated EAN barcode to {new_barcode} for item {item_code}")
                         else:
-                            frappe.logger().info(f"Barcode {new_barcode} already exists for another item, not updating {item_code}")
+                            self._log.debug(f"Barcode {new_barcode} already exists for another item, not updating {item_code}")
                 else:
-                    frappe.logger().warning(f"Invalid EAN barcode '{new_barcode}' for item {item_code}, skipping")
+                    self._log.warning(f"Invalid EAN barcode '{new_barcode}' for item {item_code}, skipping")
 
             # Handle tax information
             if item_data.get('tax_rate'):
@@ -1021,11 +1178,11 @@ class XMLItemImporter:
             if is_update:
                 existing_item.save(ignore_permissions=True)
                 self.updated_count += 1
-                frappe.logger().info(f"Updated item: {item_code}")
+                self._log.debug(f"Updated item: {item_code}")
             else:
                 existing_item.insert(ignore_permissions=True)
                 self.imported_count += 1
-                frappe.logger().info(f"Created item: {item_code}")
+                self._log.debug(f"Created item: {item_code}")
 
             # Handle images
             if item_data.get('product_images'):
@@ -1046,9 +1203,9 @@ class XMLItemImporter:
             error_msg = f"Failed to process item {item_data.get('item_code', 'Unknown')}: {str(e)}"
             self.add_error(error_msg)
             frappe.log_error(error_msg)
-            frappe.logger().error(f"Item import error: {error_msg}")
+            self._log.error(f"Item import error: {error_msg}")
             import traceback
-            frappe.logger().error(traceback.format_exc())
+            self._log.error(traceback.format_exc())
             return False
 
     def handle_item_images(self, item_doc: Document, images: List[Dict]) -> None:
@@ -1135,14 +1292,14 @@ class XMLItemImporter:
                 })
                 price_doc.insert(ignore_permissions=True)
 
-            frappe.logger().info(f"Set {price_list} price for {item_code}: {price} {currency}")
+            self._log.debug(f"Set {price_list} price for {item_code}: {price} {currency}")
 
         except Exception as e:
             frappe.log_error(f"Failed to create/update {price_list} price for {item_code}: {str(e)}")
 
     def ensure_price_list_exists(self, price_list_name: str, currency: str, selling: bool = True) -> None:
         """Ensure price list exists"""
-        if not frappe.db.exists("Price List", price_list_name):
+        if not frappe.get_cached_value("Price List", price_list_name, "name"):
             try:
                 price_list = frappe.get_doc({
                     "doctype": "Price List",
@@ -1153,7 +1310,7 @@ class XMLItemImporter:
                     "enabled": 1
                 })
                 price_list.insert(ignore_permissions=True)
-                frappe.logger().info(f"Created price list: {price_list_name}")
+                self._log.info(f"Created price list: {price_list_name}")
             except Exception as e:
                 frappe.log_error(f"Failed to create price list {price_list_name}: {str(e)}")
 
@@ -1161,7 +1318,7 @@ class XMLItemImporter:
         """Update stock levels using Stock Entry"""
         try:
             # Get default warehouse
-            warehouse = frappe.db.get_single_value("Stock Settings", "default_warehouse")
+            warehouse = frappe.get_cached_doc("Stock Settings").default_warehouse
             if not warehouse:
                 # Get first warehouse
                 warehouse = frappe.db.get_value("Warehouse", {"company": self.company}, "name")
@@ -1197,18 +1354,28 @@ class XMLItemImporter:
         except Exception as e:
             frappe.log_error(f"Failed to update stock for {item_doc.item_code}: {str(e)}")
 
+    def close(self) -> None:
+        """Release the pooled HTTP connections once the import is finished"""
+        self._http.close()
+
     def add_error(self, error_msg: str) -> None:
-        """Add error to error list"""
-        self.errors.append(error_msg)
+        """Add error to error list, keeping only the first MAX_COLLECTED_ERRORS messages"""
+        if len(self.errors) < MAX_COLLECTED_ERRORS:
+            self.errors.append(error_msg)
         self.error_count += 1
 
     def process_xml_content(self, xml_content: str) -> Dict[str, Any]:
         """Process XML content directly (for pasted content debugging)"""
         try:
-            frappe.logger().info("Processing pasted XML content for item import")
+            self._log.info("Processing pasted XML content for item import")
+
+            # Strip leading whitespace once (it would misplace the XML declaration);
+            # unchanged content is not copied, and the result is what gets parsed
+            if xml_content:
+                xml_content = xml_content.lstrip()
 
             # Check if content is meaningful
-            if not xml_content or len(xml_content.strip()) < 50:
+            if not xml_content or len(xml_content) < 50:
                 return {
                     "success": False,
                     "error": f"XML content is empty or too small: {len(xml_content) if xml_content else 0} bytes",
@@ -1218,11 +1385,11 @@ class XMLItemImporter:
 
             # Parse XML
             try:
-                root = ET.fromstring(xml_content.strip())
-                frappe.logger().info(f"Successfully parsed XML with root element: {root.tag}")
+                root = ET.fromstring(xml_content)
+                self._log.info(f"Successfully parsed XML with root element: {root.tag}")
             except ET.ParseError as e:
                 error_msg = f"Failed to parse XML: {str(e)}"
-                frappe.logger().error(error_msg)
+                self._log.error(error_msg)
                 return {
                     "success": False,
                     "error": error_msg,
@@ -1238,18 +1405,18 @@ class XMLItemImporter:
             item_elements = (root.findall('.//SHOPITEM') or
                            root.findall('.//item') or
                            root.findall('.//product'))
-            frappe.logger().info(f"Found {len(item_elements)} item elements to process")
+            self._log.info(f"Found {len(item_elements)} item elements to process")
 
             for item_elem in item_elements:
                 try:
                     item_doc = self.create_or_update_item(item_elem)
                     if item_doc:
                         imported_items.append(item_doc.item_code)
-                        frappe.logger().info(f"Successfully processed item: {item_doc.item_code}")
+                        self._log.debug(f"Successfully processed item: {item_doc.item_code}")
                 except Exception as e:
                     error_msg = f"Failed to process item: {str(e)}"
                     processing_errors.append(error_msg)
-                    frappe.logger().error(error_msg)
+                    self._log.error(error_msg)
 
             # Prepare summary
             success = len(imported_items) > 0
@@ -1262,7 +1429,7 @@ class XMLItemImporter:
                 "error_count": len(processing_errors)
             }
 
-            frappe.logger().info(f"Pasted XML item processing completed: {summary}")
+            self._log.info(f"Pasted XML item processing completed: {summary}")
             return summary
 
         except Exception as e:
@@ -1274,54 +1441,58 @@ class XMLItemImporter:
                 "imported_items": [],
                 "errors": [error_msg]
             }
+        finally:
+            self.close()
 
-    def import_from_xml(self) -> Dict[str, Any]:
-        """Main import function"""
+    def import_from_xml(self, response: Optional[requests.Response] = None) -> Dict[str, Any]:
+        """Main import function, optionally reading an already fetched streamed response"""
         try:
-            frappe.logger().info(f"Starting XML import from: {self.xml_source}")
-
-            # Fetch and parse XML
-            xml_content = self.fetch_xml_content()
-            root = self.parse_xml(xml_content)
+            self._log.info(f"Starting XML import from: {self.xml_source}")
 
-            # Find all SHOPITEM elements
-            shopitems = root.findall('.//SHOPITEM')
-
-            frappe.logger().info(f"Found {len(shopitems)} items to process")
-
-            # Process each item with progress updates
-            for idx, shopitem in enumerate(shopitems, 1):
+            # Stream and parse XML one SHOPITEM at a time
+            total = 0
+            with self.open_xml_stream(response) as stream:
                 try:
-                    # Update progress
-                    progress = (idx / len(shopitems)) * 100
-                    frappe.publish_realtime(
-                        "import_progress",
-                        {
-                            "current": idx,
-                            "total": len(shopitems),
-                            "percent": progress,
-                            "message": f"Processing item {idx} of {len(shopitems)}"
-                        },
-                        user=frappe.session.user
-                    )
-
-                    frappe.logger().info(f"Processing item {idx}/{len(shopitems)}: ID {shopitem.get('id', 'Unknown')}")
-                    item_data = self.parse_shop_item(shopitem)
-                    success = self.create_or_update_item(item_data)
-                    if not success:
-                        frappe.logger().warning(f"Failed to import item {idx}: {item_data.get('item_code', 'Unknown')}")
-                except Exception as e:
-                    error_msg = f"Error processing SHOPITEM {idx} ID {shopitem.get('id', 'Unknown')}: {str(e)}"
-                    frappe.logger().error(error_msg)
-                    self.add_error(error_msg)
-                    continue
+                    for idx, shopitem in enumerate(self.iter_shop_items(stream), 1):
+                        total = idx
+                        try:
+                            # Update progress
+                            if idx % PROGRESS_INTERVAL == 0:
+                                frappe.publish_realtime(
+                                    "import_progress",
+                                    {
+                                        "current": idx,
+                                        "total": None,
+                                        "percent": self.get_stream_progress(stream),
+                                        "message": f"Processing item {idx}"
+                                    },
+                                    user=frappe.session.user
+                                )
+
+                            # Log batch milestones only; per-item details go to DEBUG
+                            if idx % LOG_MILESTONE_INTERVAL == 0:
+                                self._log.info(f"Processing item {idx}")
+                            elif self._log.isEnabledFor(logging.DEBUG):
+                                self._log.debug(f"Processing item {idx}: ID {shopitem.get('id', 'Unknown')}")
+                            item_data = self.parse_shop_item(shopitem)
+                            success = self.create_or_update_item(item_data)
+                            if not success:
+                                self._log.warning(f"Failed to import item {idx}: {item_data.get('item_code', 'Unknown')}")
+                        except Exception as e:
+                            error_msg = f"Error processing SHOPITEM {idx} ID {shopitem.get('id', 'Unknown')}: {str(e)}"
+                            self._log.error(error_msg)
+                            self.add_error(error_msg)
+                            continue
+
+                except XML_PARSE_ERRORS as e:
+                    frappe.throw(f"XML parsing failed: {str(e)}")
 
             # Send completion message
             frappe.publish_realtime(
                 "import_progress",
                 {
-                    "current": len(shopitems),
-                    "total": len(shopitems),
+                    "current": total,
+                    "total": total,
                     "percent": 100,
                     "message": "Import completed",
                     "completed": True
@@ -1329,7 +1500,7 @@ class XMLItemImporter:
                 user=frappe.session.user
             )
 
-            frappe.logger().info(f"Completed processing {len(shopitems)} items")
+            self._log.info(f"Completed processing {total} items")
 
             # Return summary
             summary = {
@@ -1338,10 +1509,10 @@ class XMLItemImporter:
                 "updated": self.updated_count,
                 "errors": self.error_count,
                 "error_messages": self.errors[:10],  # First 10 errors
-                "total_processed": len(shopitems)
+                "total_processed": total
             }
 
-            frappe.logger().info(f"Import completed: {summary}")
+            self._log.info(f"Import completed: {summary}")
             return summary
 
         except Exception as e:
@@ -1354,6 +1525,8 @@ class XMLItemImporter:
                 "updated": self.updated_count,
                 "errors": self.error_count
             }
+        finally:
+            self.close()
 
 
 # Public API functions
@@ -1389,61 +1562,89 @@ def scheduled_xml_import():
         frappe.logger().debug("No enabled XML Import Configurations found")
         return
 
-    from datetime import datetime, timedelta
-    from frappe.utils import now_datetime, get_datetime
-
     for config in configs:
         try:
             # Check if it's time to import based on frequency
             if not should_run_import(config):
                 continue
 
-            frappe.logger().info(f"Running scheduled import for {config.name} ({config.import_type})")
-
-            if config.import_type == "Items":
-                result = import_xml_items(config.xml_feed_url, config.company)
-
-                # Create import log
-                from xml_importer.xml_importer.doctype.xml_import_log.xml_import_log import create_item_import_log
-                create_item_import_log(
-                    xml_source=config.xml_feed_url,
-                    status="Success" if result.get("success") else "Failed",
-                    imported=result.get("imported", 0),
-                    updated=result.get("updated", 0),
-                    errors=result.get("errors", 0),
-                    error_details="\n".join(result.get("error_messages", [])),
-                    summary=result
-                )
+            # Each feed runs in its own background job so workers import them in parallel;
+            # a feed whose previous import is still queued or running is not queued again
+            frappe.enqueue(
+                "xml_importer.xml_importer.item_importer.run_scheduled_import",
+                queue="long",
+                job_id=f"xml_import::{config.name}",
+                deduplicate=True,
+                config_name=config.name
+            )
 
-            elif config.import_type == "Orders":
-                from xml_importer.xml_importer.order_importer import import_xml_orders
-                result = import_xml_orders(config.xml_feed_url, config.company)
-
-                # Create import log
-                from xml_importer.xml_importer.doctype.xml_import_log.xml_import_log import create_order_import_log
-                create_order_import_log(
-                    xml_source=config.xml_feed_url,
-                    status="Success" if result.get("success") else "Failed",
-                    imported=result.get("imported", 0),
-                    errors=result.get("errors", 0),
-                    error_details="\n".join(result.get("error_messages", [])),
-                    summary=result
-                )
+        except Exception as e:
+            frappe.log_error(f"Failed to queue scheduled XML import for {config.name}: {str(e)}")
 
-            # Update last import time
-            frappe.db.set_value("XML Import Configuration", config.name, {
-                "last_import": now_datetime(),
-                "last_import_status": "Success" if result.get("success") else "Failed"
-            })
-            frappe.db.commit()
 
-        except Exception as e:
-            frappe.log_error(f"Scheduled XML import error for {config.name}: {str(e)}")
-            frappe.db.set_value("XML Import Configuration", config.name, {
-                "last_import": now_datetime(),
-                "last_import_status": "Failed"
-            })
-            frappe.db.commit()
+def run_scheduled_import(config_name):
+    """Run the import of one XML Import Configuration, queued by scheduled_xml_import"""
+    from frappe.utils import now_datetime
+
+    config = frappe.db.get_value(
+        "XML Import Configuration",
+        config_name,
+        ["name", "import_type", "xml_feed_url", "company"],
+        as_dict=True
+    )
+    if not config:
+        return
+
+    try:
+        frappe.logger().info(f"Running scheduled import for {config.name} ({config.import_type})")
+
+        if config.import_type == "Items":
+            result = import_xml_items(config.xml_feed_url, config.company)
+
+            # Create import log
+            from xml_importer.xml_importer.doctype.xml_import_log.xml_import_log import create_item_import_log
+            create_item_import_log(
+                xml_source=config.xml_feed_url,
+                status="Success" if result.get("success") else "Failed",
+                imported=result.get("imported", 0),
+                updated=result.get("updated", 0),
+                errors=result.get("errors", 0),
+                error_details="\n".join(result.get("error_messages", [])),
+                summary=result
+            )
+
+        elif config.import_type == "Orders":
+            from xml_importer.xml_importer.order_importer import import_xml_orders
+            result = import_xml_orders(
+                config.xml_feed_url, config.company,
+                config=frappe.get_doc("XML Import Configuration", config.name)
+            )
+
+            # Create import log
+            from xml_importer.xml_importer.doctype.xml_import_log.xml_import_log import create_order_import_log
+            create_order_import_log(
+                xml_source=config.xml_feed_url,
+                status="Success" if result.get("success") else "Failed",
+                imported=result.get("imported", 0),
+                errors=result.get("errors", 0),
+                error_details="\n".join(result.get("error_messages", [])),
+                summary=result
+            )
+
+        # Update last import time
+        frappe.db.set_value("XML Import Configuration", config.name, {
+            "last_import": now_datetime(),
+            "last_import_status": "Success" if result.get("success") else "Failed"
+        })
+        frappe.db.commit()
+
+    except Exception as e:
+        frappe.log_error(f"Scheduled XML import error for {config.name}: {str(e)}")
+        frappe.db.set_value("XML Import Configuration", config.name, {
+            "last_import": now_datetime(),
+            "last_import_status": "Failed"
+        })
+        frappe.db.commit()
 
 
 def should_run_import(config):
@@ -1451,7 +1652,6 @@ def should_run_import(config):
     Check if import should run based on frequency setting and last import time
     """
     from frappe.utils import now_datetime, get_datetime
-    from datetime import timedelta
 
     if not config.get("last_import"):
         # Never imported before - run it
@@ -1463,21 +1663,9 @@ def should_run_import(config):
 
     frequency = config.get("import_frequency", "Hourly")
 
-    # Map frequency to minutes
-    frequency_map = {
-        "Every 5 Minutes": 5,
-        "Every 10 Minutes": 10,
-        "Every 15 Minutes": 15,
-        "Every 30 Minutes": 30,
-        "Hourly": 60,
-        "Every 2 Hours": 120,
-        "Every 6 Hours": 360,
-        "Daily": 1440,
-        "Weekly": 10080
-    }
-
-    required_minutes = frequency_map.get(frequency, 60)  # Default to hourly
-    required_delta = timedelta(minutes=required_minutes)
+    # Default to hourly
+    required_minutes = IMPORT_FREQUENCY_MINUTES.get(frequency, 60)
+    required_delta = IMPORT_FREQUENCY_DELTAS.get(frequency, IMPORT_FREQUENCY_DELTAS["Hourly"])
 
     should_run = time_diff >= required_delta
 
@@ -1490,10 +1678,21 @@ def should_run_import(config):
     return should_run
 
 
+def get_notification_recipients(recipients: str) -> List[str]:
+    """Split a comma-separated recipient list, dropping blanks and duplicates (case-insensitive)"""
+    unique_recipients = {}
+    for email in RECIPIENT_SPLIT_RE.split((recipients or "").strip()):
+        if email:
+            unique_recipients.setdefault(email.lower(), email)
+    return list(unique_recipients.values())
+
+
 def send_import_notification(result: Dict[str, Any], recipients: str):
     """Send email notification about import results"""
     try:
-        recipients_list = [email.strip() for email in recipients.split(",")]
+        recipients_list = get_notification_recipients(recipients)
+        if not recipients_list:
+            return
 
         subject = "XML Item Import Results"
 
@@ -1519,10 +1718,13 @@ def send_import_notification(result: Dict[str, Any], recipients: str):
         if result.get('error_messages'):
             message += f"\n\nFirst few errors:\n" + "\n".join(result['error_messages'])
 
+        # One queued email for all recipients; the email queue worker sends it
+        # in the background over a shared SMTP session
         frappe.sendmail(
             recipients=recipients_list,
             subject=subject,
-            message=message
+            message=message,
+            now=False
         )
 
     except Exception as e:
@@ -9,20 +9,151 @@ License: MIT
 
 import frappe
 import requests
-import xml.etree.ElementTree as ET
-from frappe.model.document import Document
-from frappe.utils import now, cstr, flt, cint, strip_html_tags, get_datetime
+from frappe.model.document import Document, bulk_insert
+from frappe.utils import now, cstr, flt, cint, sbool, strip_html_tags, get_datetime
 from frappe.utils.file_manager import save_file
 import re
 import os
+import io
 from urllib.parse import urlparse
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, BinaryIO, Iterator, Tuple, Union
 from datetime import datetime
+from .item_importer import index_children
+
+try:
+    # libxml2 bindings parse considerably faster than the pure ElementTree wrapper
+    from lxml import etree as ET
+    from lxml.html import fragment_fromstring as html_fragment_fromstring
+    # Allow very large feeds and never expand entities
+    XML_PARSER_OPTIONS = {"huge_tree": True, "resolve_entities": False}
+    LXML_AVAILABLE = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    XML_PARSER_OPTIONS = {}
+    LXML_AVAILABLE = False
+
+# Bytes that may precede the root element of a feed that is otherwise empty
+XML_BLANK_BYTES = b' \t\r\n\xef\xbb\xbf'
+
+# Patterns used by clean_html_content and clean_name
+CDATA_RE = re.compile(r'<!\[CDATA\[(.*?)\]\]>', re.DOTALL)
+WHITESPACE_RE = re.compile(r'\s+')
+NAME_INVALID_CHARS_RE = re.compile(r'[<>&"\']')
+# Anything clean_name would change besides trimming: tags, invalid characters,
+# whitespace runs or whitespace other than a plain space
+NAME_NEEDS_CLEANING_RE = re.compile(r'[<>&"\']|\s\s|[^\S ]')
+
+# Space characters used as thousands separators, removed by parse_decimal
+DECIMAL_GROUPING_SPACES = str.maketrans('', '', ' \u00a0\u202f')
+
+# Lowercased element names treated as orders in pasted XML ("objednavka" is Slovak for order)
+ORDER_ELEMENT_TAGS = frozenset(('order', 'objednavka'))
+
+# (order_data key, ORDER child tag) pairs copied as plain text
+ORDER_TEXT_FIELDS = (
+    ('external_order_id', 'ORDER_ID'),
+    ('order_code', 'CODE'),
+    ('order_date', 'DATE'),
+    ('order_status', 'STATUS'),
+    ('package_number', 'PACKAGE_NUMBER'),
+    ('source_name', 'SOURCE_NAME'),
+)
+
+# (item_data key, ITEM child tag) pairs copied as plain text
+ORDER_ITEM_TEXT_FIELDS = (
+    ('item_type', 'TYPE'),  # product, shipping, billing
+    ('item_code', 'CODE'),
+    ('variant_name', 'VARIANT_NAME'),
+    ('barcode', 'EAN'),
+    ('plu', 'PLU'),
+    ('manufacturer', 'MANUFACTURER'),
+    ('supplier', 'SUPPLIER'),
+    ('unit', 'UNIT'),
+    ('item_status', 'STATUS'),
+)
+
+# Address fields compared when deciding whether an address was already handled
+ADDRESS_KEY_FIELDS = (
+    'customer_name', 'company_name', 'street', 'house_number', 'city', 'postal_code', 'country',
+)
+
+# Slovak/local country names and codes mapped to ERPNext country names
+COUNTRY_NAME_MAP = {
+    # Slovak to English mappings
+    "Slovensko": "Slovakia",
+    "Česko": "Czech Republic",
+    "Česká republika": "Czech Republic",
+    "Rakúsko": "Austria",
+    "Nemecko": "Germany",
+    "Poľsko": "Poland",
+    "Maďarsko": "Hungary",
+    "Ukrajina": "Ukraine",
+    "Francúzsko": "France",
+    "Taliansko": "Italy",
+    "Španielsko": "Spain",
+    "Portugalsko": "Portugal",
+    "Holandsko": "Netherlands",
+    "Belgicko": "Belgium",
+    "Švajčiarsko": "Switzerland",
+
+    # Common variations
+    "SK": "Slovakia",
+    "CZ": "Czech Republic",
+    "AT": "Austria",
+    "DE": "Germany",
+    "PL": "Poland",
+    "HU": "Hungary",
+    "UA": "Ukraine",
+    "FR": "France",
+    "IT": "Italy",
+    "ES": "Spain",
+    "PT": "Portugal",
+    "NL": "Netherlands",
+    "BE": "Belgium",
+    "CH": "Switzerland"
+}
+COUNTRY_NAME_MAP_CASEFOLDED = {name.casefold(): country for name, country in COUNTRY_NAME_MAP.items()}
+
+# Order statuses that mark a cancelled order ("zrušen" is Slovak for cancelled)
+CANCELLED_STATUS_RE = re.compile(r'storno|cancel|zrušen', re.IGNORECASE)
+
+# Price list set on imported Sales Orders, created on first use
+SELLING_PRICE_LIST = "Standard Selling"
+
+# Feed units of measure mapped to ERPNext UOMs ("ks" is Slovak for pieces)
+UOM_MAP = {'ks': 'Nos'}
+
+# Log import progress at INFO level once every N orders
+ORDER_LOG_INTERVAL = 100
+
+# Most error messages kept (and written to the Error Log) per import; error_count counts all
+MAX_COLLECTED_ERRORS = 100
+
+# Largest IN list sent when prefetching existing orders
+PREFETCH_CHUNK_SIZE = 1000
+
+# Orders imported per database commit unless the configuration overrides it
+DEFAULT_COMMIT_BATCH_SIZE = 50
+
+# Savepoint taken before each order so a failing order only discards its own writes
+ORDER_SAVEPOINT = "xml_order_import"
+
+# Rows per multi-row INSERT when creating placeholder Items in bulk
+BULK_INSERT_CHUNK_SIZE = 5000
+
+# Customers per multi-row UPDATE when writing queued customer changes
+CUSTOMER_UPDATE_CHUNK_SIZE = 100
+
+# Savepoint around bulk writes so a failing one can be discarded (and inserts retried row by row)
+BULK_WRITE_SAVEPOINT = "xml_order_bulk_write"
+
+# Savepoint around customer inserts so a concurrent duplicate can be recovered from
+CUSTOMER_SAVEPOINT = "xml_order_customer"
 
 class XMLOrderImporter:
     """Import orders from XML feed into ERPNext Sales Orders"""
 
-    def __init__(self, xml_source: str = None, company: str = None, config=None):
+    def __init__(self, xml_source: str = None, company: str = None, config=None, sync: bool = True):
         """
         Initialize XML Order Importer
 
@@ -30,25 +161,50 @@ class XMLOrderImporter:
             xml_source: URL or file path to XML feed
             company: Company name in ERPNext (default: default company)
             config: XML Import Configuration document (optional)
+            sync: Process orders in this process; otherwise enqueue them in shards
         """
         self.xml_source = xml_source
         self.company = company or frappe.defaults.get_global_default("company")
         self.config = config
+        self.sync = sync
+        # Per-order INFO logs are only written when xml_importer_debug is set in site config
+        self._debug = bool(frappe.conf.get('xml_importer_debug'))
         self.imported_count = 0
         self.updated_count = 0
         self.error_count = 0
         self.errors = []
+        self.commit_batch_size = (
+            cint(self.config.get('commit_batch_size')) if self.config else 0
+        ) or DEFAULT_COMMIT_BATCH_SIZE
 
         # Initialize required data
         self.ensure_required_data()
 
+        # Default warehouse for order rows, read once per import
+        self.default_warehouse = frappe.get_cached_doc("Stock Settings").default_warehouse
+
+        # Lookups cached for the whole import; misses are cached as None
+        self._customer_email_cache = {}
+        self._customer_name_cache = {}
+        self._address_cache = {}
+        self._checked_address_titles = set()
+        self._handled_addresses = set()
+        self._known_items = set()
+
+        # External order IDs already looked up, and those that exist as Sales Orders
+        self._checked_order_ids = set()
+        self._existing_order_ids = set()
+
+        # (customer, fields) updates collected while a batch is processed, written in bulk afterwards
+        self._pending_customer_updates = None
+
     def ensure_required_data(self):
         """Ensure required master data exists"""
         # Ensure default price list exists
-        if not frappe.db.exists("Price List", "Standard Selling"):
+        if not frappe.get_cached_value("Price List", SELLING_PRICE_LIST, "name"):
             price_list = frappe.get_doc({
                 "doctype": "Price List",
-                "price_list_name": "Standard Selling",
+                "price_list_name": SELLING_PRICE_LIST,
                 "currency": "EUR",
                 "selling": 1,
                 "buying": 0
@@ -56,7 +212,7 @@ class XMLOrderImporter:
             price_list.insert(ignore_permissions=True)
 
         # Ensure default territory exists
-        if not frappe.db.exists("Territory", "Slovakia"):
+        if not frappe.get_cached_value("Territory", "Slovakia", "name"):
             territory = frappe.get_doc({
                 "doctype": "Territory",
                 "territory_name": "Slovakia",
@@ -70,103 +226,108 @@ class XMLOrderImporter:
         if not country_name:
             return "Slovakia"  # Default country
 
-        country_mapping = {
-            # Slovak to English mappings
-            "Slovensko": "Slovakia",
-            "Česko": "Czech Republic",
-            "Česká republika": "Czech Republic",
-            "Rakúsko": "Austria",
-            "Nemecko": "Germany",
-            "Poľsko": "Poland",
-            "Maďarsko": "Hungary",
-            "Ukrajina": "Ukraine",
-            "Francúzsko": "France",
-            "Taliansko": "Italy",
-            "Španielsko": "Spain",
-            "Portugalsko": "Portugal",
-            "Holandsko": "Netherlands",
-            "Belgicko": "Belgium",
-            "Švajčiarsko": "Switzerland",
-
-            # Common variations
-            "SK": "Slovakia",
-            "CZ": "Czech Republic",
-            "AT": "Austria",
-            "DE": "Germany",
-            "PL": "Poland",
-            "HU": "Hungary",
-            "UA": "Ukraine",
-            "FR": "France",
-            "IT": "Italy",
-            "ES": "Spain",
-            "PT": "Portugal",
-            "NL": "Netherlands",
-            "BE": "Belgium",
-            "CH": "Switzerland"
-        }
-
-        # Try exact match first
-        mapped_country = country_mapping.get(country_name.strip())
-        if mapped_country:
-            return mapped_country
-
-        # Try case-insensitive match
-        for slovak_name, english_name in country_mapping.items():
-            if slovak_name.lower() == country_name.lower().strip():
-                return english_name
-
-        # If no mapping found, return original (might be already in English)
-        return country_name.strip()
-
-    def fetch_xml_content(self) -> str:
-        """Fetch XML content from URL or file"""
+        country_name = country_name.strip()
+        return (
+            COUNTRY_NAME_MAP.get(country_name)
+            or COUNTRY_NAME_MAP_CASEFOLDED.get(country_name.casefold())
+            # If no mapping found, return original (might be already in English)
+            or country_name
+        )
+
+    def open_xml_stream(self) -> BinaryIO:
+        """Open the XML source (URL or file) as a binary stream for incremental parsing"""
         try:
             if self.xml_source.startswith(('http://', 'https://')):
-                # Fetch from URL
-                response = requests.get(self.xml_source, timeout=60)
+                # Stream from URL without buffering the whole body
+                response = requests.get(self.xml_source, stream=True, timeout=60)
                 response.raise_for_status()
-                content = response.text
+                response.raw.decode_content = True
 
-                # Log content details for debugging
-                content_length = len(content)
-                frappe.logger().info(f"Fetched XML content: {content_length} bytes from {self.xml_source}")
-                frappe.log_error(f"Order Import - XML Content ({content_length} bytes): {content[:500]}...", "Order Import Content")
-
-                return content
+                frappe.logger().info(
+                    f"Streaming XML content ({response.headers.get('Content-Length', 'unknown')} bytes) from {self.xml_source}"
+                )
+                return response.raw
             else:
                 # Read from file
-                with open(self.xml_source, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    frappe.logger().info(f"Read XML content: {len(content)} bytes from file {self.xml_source}")
-                    return content
+                frappe.logger().info(f"Streaming XML content from file {self.xml_source}")
+                return open(self.xml_source, 'rb')
         except Exception as e:
             frappe.throw(f"Failed to fetch XML content: {str(e)}")
 
-    def parse_xml(self, xml_content: str) -> ET.Element:
-        """Parse XML content"""
-        try:
-            # Remove any BOM and clean content
-            if xml_content.startswith('\ufeff'):
-                xml_content = xml_content[1:]
+    def iter_orders(self, stream: BinaryIO) -> Iterator[ET.Element]:
+        """
+        Yield ORDER elements one at a time from a binary XML stream
 
-            root = ET.fromstring(xml_content)
-            return root
-        except ET.ParseError as e:
-            frappe.throw(f"XML parsing failed: {str(e)}")
+        Each element is cleared and detached from its parent once the caller is
+        done with it, so memory use is bounded by a single order instead of the
+        whole feed. Both parsers handle a UTF-8 BOM on binary input by themselves.
+        An empty or whitespace-only feed yields no orders.
+        """
+        if not hasattr(stream, 'peek'):
+            stream = io.BufferedReader(stream)
+
+        # Drop leading blank bytes; nothing left means there is no root element to parse
+        head = stream.peek(1)
+        while head and not head.lstrip(XML_BLANK_BYTES):
+            stream.read(len(head))
+            head = stream.peek(1)
+        if not head:
+            return
+
+        if LXML_AVAILABLE:
+            # libxml2 filters on the tag itself, so only ORDER end events reach Python
+            for _, elem in ET.iterparse(stream, events=('end',), tag='ORDER', **XML_PARSER_OPTIONS):
+                yield elem
+                elem.clear()
+                # Drop this and any earlier siblings already handed out
+                parent = elem.getparent()
+                if parent is not None:
+                    while elem.getprevious() is not None:
+                        del parent[0]
+                    parent.remove(elem)
+            return
+
+        # Open elements, tracked from 'start' events so processed orders can be
+        # removed from their parent (the stdlib ElementTree has no getparent())
+        open_elements = []
+        for event, elem in ET.iterparse(stream, events=('start', 'end')):
+            if event == 'start':
+                open_elements.append(elem)
+                continue
+
+            open_elements.pop()
+            if elem.tag != 'ORDER':
+                continue
+
+            yield elem
+            elem.clear()
+            if open_elements:
+                open_elements[-1].remove(elem)
 
     def clean_html_content(self, content: str) -> str:
         """Clean HTML content and extract text"""
         if not content:
             return ""
 
+        # Plain text has no CDATA or tags to strip
+        if '<' not in content:
+            return WHITESPACE_RE.sub(' ', content).strip()
+
         # Remove CDATA
-        content = re.sub(r'<!\[CDATA\[(.*?)\]\]>', r'\1', content, flags=re.DOTALL)
+        if '<![CDATA[' in content:
+            content = CDATA_RE.sub(r'\1', content)
 
-        # Strip HTML tags but preserve line breaks
-        content = strip_html_tags(content)
+        # Strip HTML tags in a single pass through libxml2 where available
+        if LXML_AVAILABLE:
+            try:
+                content = html_fragment_fromstring(content, create_parent='div').text_content()
+            except ET.LxmlError:
+                content = strip_html_tags(content)
+        else:
+            content = strip_html_tags(content)
 
         # Clean up extra whitespace
-        content = re.sub(r'\s+', ' ', content).strip()
+        content = WHITESPACE_RE.sub(' ', content).strip()
 
         return content
 
@@ -175,14 +336,18 @@ class XMLOrderImporter:
         if not name:
             return ""
 
+        # Most names need nothing more than trimming
+        if not NAME_NEEDS_CLEANING_RE.search(name):
+            return name.strip()
+
         # Remove HTML tags first
         name = strip_html_tags(name)
 
         # Remove special characters that ERPNext doesn't allow in names
-        name = re.sub(r'[<>&"\']', '', name)
+        name = NAME_INVALID_CHARS_RE.sub('', name)
 
         # Replace multiple spaces with single space
-        name = re.sub(r'\s+', ' ', name)
+        name = WHITESPACE_RE.sub(' ', name)
 
         # Trim and return
         return name.strip()
@@ -200,128 +365,138 @@ class XMLOrderImporter:
         # Replace comma with dot for decimal separator
         value = value.replace(',', '.')
 
+        # Plain numbers parse directly; flt() only handles anything unusual
+        try:
+            return float(value)
+        except ValueError:
+            pass
+
+        # Slovak amounts may group thousands with (non-breaking) spaces, e.g. "1 234,50"
+        try:
+            return float(value.translate(DECIMAL_GROUPING_SPACES))
+        except ValueError:
+            pass
+
         try:
             return flt(value)
         except:
             return 0.0
 
+    def child_texts(self, parent: ET.Element) -> Dict[str, str]:
+        """Map each child tag of a leaf group element to its stripped text"""
+        return index_children(parent)[0]
+
     def parse_order(self, order_elem: ET.Element) -> Dict[str, Any]:
         """Parse ORDER XML element to dictionary with English property names"""
-        order_data = {}
+        texts, children = index_children(order_elem)
+        text = texts.get
 
         # Basic order information
-        order_data['external_order_id'] = self.get_element_text(order_elem, 'ORDER_ID')
-        order_data['order_code'] = self.get_element_text(order_elem, 'CODE')
-        order_data['order_date'] = self.get_element_text(order_elem, 'DATE')
-        order_data['order_status'] = self.get_element_text(order_elem, 'STATUS')
+        order_data = {key: text(tag, '') for key, tag in ORDER_TEXT_FIELDS}
 
         # Currency information
-        currency_elem = order_elem.find('CURRENCY')
+        currency_elem = children.get('CURRENCY')
         if currency_elem is not None:
-            order_data['currency_code'] = self.get_element_text(currency_elem, 'CODE')
-            order_data['exchange_rate'] = self.parse_decimal(self.get_element_text(currency_elem, 'EXCHANGE_RATE'))
+            currency = self.child_texts(currency_elem).get
+            order_data['currency_code'] = currency('CODE', '')
+            order_data['exchange_rate'] = self.parse_decimal(currency('EXCHANGE_RATE', ''))
 
         # Customer information
-        customer_elem = order_elem.find('CUSTOMER')
+        customer_elem = children.get('CUSTOMER')
         if customer_elem is not None:
-            order_data['customer_email'] = self.get_element_text(customer_elem, 'EMAIL')
-            order_data['customer_phone'] = self.get_element_text(customer_elem, 'PHONE')
-            order_data['ip_address'] = self.get_element_text(customer_elem, 'IP_ADDRESS')
+            customer_texts, customer_children = index_children(customer_elem)
+            customer = customer_texts.get
+            order_data['customer_email'] = customer('EMAIL', '')
+            order_data['customer_phone'] = customer('PHONE', '')
+            order_data['ip_address'] = customer('IP_ADDRESS', '')
 
             # Billing address
-            billing_elem = customer_elem.find('BILLING_ADDRESS')
+            billing_elem = customer_children.get('BILLING_ADDRESS')
             if billing_elem is not None:
+                billing = self.child_texts(billing_elem).get
                 order_data['billing_address'] = {
-                    'customer_name': self.clean_name(self.get_element_text(billing_elem, 'NAME')),
-                    'company_name': self.clean_name(self.get_element_text(billing_elem, 'COMPANY')),
-                    'street': self.get_element_text(billing_elem, 'STREET'),
-                    'house_number': self.get_element_text(billing_elem, 'HOUSENUMBER'),
-                    'city': self.get_element_text(billing_elem, 'CITY'),
-                    'postal_code': self.get_element_text(billing_elem, 'ZIP'),
-                    'country': self.map_country_name(self.get_element_text(billing_elem, 'COUNTRY')),
-                    'company_id': self.get_element_text(billing_elem, 'COMPANY_ID'),
-                    'vat_id': self.get_element_text(billing_elem, 'VAT_ID'),
-                    'customer_id_number': self.get_element_text(billing_elem, 'CUSTOMER_IDENTIFICATION_NUMBER')
+                    'customer_name': self.clean_name(billing('NAME', '')),
+                    'company_name': self.clean_name(billing('COMPANY', '')),
+                    'street': billing('STREET', ''),
+                    'house_number': billing('HOUSENUMBER', ''),
+                    'city': billing('CITY', ''),
+                    'postal_code': billing('ZIP', ''),
+                    'country': self.map_country_name(billing('COUNTRY', '')),
+                    'company_id': billing('COMPANY_ID', ''),
+                    'vat_id': billing('VAT_ID', ''),
+                    'customer_id_number': billing('CUSTOMER_IDENTIFICATION_NUMBER', '')
                 }
 
             # Shipping address
-            shipping_elem = customer_elem.find('SHIPPING_ADDRESS')
+            shipping_elem = customer_children.get('SHIPPING_ADDRESS')
             if shipping_elem is not None:
+                shipping = self.child_texts(shipping_elem).get
                 order_data['shipping_address'] = {
-                    'customer_name': self.clean_name(self.get_element_text(shipping_elem, 'NAME')),
-                    'company_name': self.clean_name(self.get_element_text(shipping_elem, 'COMPANY')),
-                    'street': self.get_element_text(shipping_elem, 'STREET'),
-                    'house_number': self.get_element_text(shipping_elem, 'HOUSENUMBER'),
-                    'city': self.get_element_text(shipping_elem, 'CITY'),
-                    'postal_code': self.get_element_text(shipping_elem, 'ZIP'),
-                    'country': self.map_country_name(self.get_element_text(shipping_elem, 'COUNTRY'))
+                    'customer_name': self.clean_name(shipping('NAME', '')),
+                    'company_name': self.clean_name(shipping('COMPANY', '')),
+                    'street': shipping('STREET', ''),
+                    'house_number': shipping('HOUSENUMBER', ''),
+                    'city': shipping('CITY', ''),
+                    'postal_code': shipping('ZIP', ''),
+                    'country': self.map_country_name(shipping('COUNTRY', ''))
                 }
 
         # Order details
-        order_data['customer_remark'] = self.clean_html_content(self.get_element_text(order_elem, 'REMARK'))
-        order_data['shop_remark'] = self.clean_html_content(self.get_element_text(order_elem, 'SHOP_REMARK'))
-        order_data['referer'] = self.clean_html_content(self.get_element_text(order_elem, 'REFERER'))
-        order_data['package_number'] = self.get_element_text(order_elem, 'PACKAGE_NUMBER')
-        order_data['total_weight'] = self.parse_decimal(self.get_element_text(order_elem, 'WEIGHT'))
+        order_data['customer_remark'] = self.clean_html_content(text('REMARK', ''))
+        order_data['shop_remark'] = self.clean_html_content(text('SHOP_REMARK', ''))
+        order_data['referer'] = self.clean_html_content(text('REFERER', ''))
+        order_data['total_weight'] = self.parse_decimal(text('WEIGHT', ''))
 
         # Total pricing
-        total_price_elem = order_elem.find('TOTAL_PRICE')
+        total_price_elem = children.get('TOTAL_PRICE')
         if total_price_elem is not None:
-            order_data['total_with_tax'] = self.parse_decimal(self.get_element_text(total_price_elem, 'WITH_VAT'))
-            order_data['total_without_tax'] = self.parse_decimal(self.get_element_text(total_price_elem, 'WITHOUT_VAT'))
-            order_data['total_tax'] = self.parse_decimal(self.get_element_text(total_price_elem, 'VAT'))
-            order_data['rounding'] = self.parse_decimal(self.get_element_text(total_price_elem, 'ROUNDING'))
-            order_data['amount_to_pay'] = self.parse_decimal(self.get_element_text(total_price_elem, 'PRICE_TO_PAY'))
-            order_data['is_paid'] = cint(self.get_element_text(total_price_elem, 'PAID'))
-            order_data['amount_paid'] = self.parse_decimal(self.get_element_text(total_price_elem, 'AMOUNT_PAID'))
+            total_price = self.child_texts(total_price_elem).get
+            order_data['total_with_tax'] = self.parse_decimal(total_price('WITH_VAT', ''))
+            order_data['total_without_tax'] = self.parse_decimal(total_price('WITHOUT_VAT', ''))
+            order_data['total_tax'] = self.parse_decimal(total_price('VAT', ''))
+            order_data['rounding'] = self.parse_decimal(total_price('ROUNDING', ''))
+            order_data['amount_to_pay'] = self.parse_decimal(total_price('PRICE_TO_PAY', ''))
+            order_data['is_paid'] = cint(total_price('PAID', ''))
+            order_data['amount_paid'] = self.parse_decimal(total_price('AMOUNT_PAID', ''))
 
         # Order items
-        order_items = []
-        items_elem = order_elem.find('ORDER_ITEMS')
-        if items_elem is not None:
-            for item in items_elem.findall('ITEM'):
-                item_data = self.parse_order_item(item)
-                order_items.append(item_data)
-
-        order_data['order_items'] = order_items
-        order_data['source_name'] = self.get_element_text(order_elem, 'SOURCE_NAME')
+        items_elem = children.get('ORDER_ITEMS')
+        order_data['order_items'] = (
+            [self.parse_order_item(item) for item in items_elem.iterfind('ITEM')]
+            if items_elem is not None else []
+        )
 
         return order_data
 
     def parse_order_item(self, item_elem: ET.Element) -> Dict[str, Any]:
         """Parse ORDER ITEM element"""
-        item_data = {}
+        texts, children = index_children(item_elem)
+        text = texts.get
 
         # Basic item information
-        item_data['item_type'] = self.get_element_text(item_elem, 'TYPE')  # product, shipping, billing
-        item_data['item_name'] = self.clean_name(self.get_element_text(item_elem, 'NAME'))
-        item_data['quantity'] = self.parse_decimal(self.get_element_text(item_elem, 'AMOUNT'))
-        item_data['item_code'] = self.get_element_text(item_elem, 'CODE')
-        item_data['variant_name'] = self.get_element_text(item_elem, 'VARIANT_NAME')
-        item_data['barcode'] = self.get_element_text(item_elem, 'EAN')
-        item_data['plu'] = self.get_element_text(item_elem, 'PLU')
-        item_data['manufacturer'] = self.get_element_text(item_elem, 'MANUFACTURER')
-        item_data['supplier'] = self.get_element_text(item_elem, 'SUPPLIER')
-        item_data['unit'] = self.get_element_text(item_elem, 'UNIT')
-        item_data['weight'] = self.parse_decimal(self.get_element_text(item_elem, 'WEIGHT'))
-        item_data['item_status'] = self.get_element_text(item_elem, 'STATUS')
-        item_data['discount'] = self.parse_decimal(self.get_element_text(item_elem, 'DISCOUNT'))
+        item_data = {key: text(tag, '') for key, tag in ORDER_ITEM_TEXT_FIELDS}
+        item_data['item_name'] = self.clean_name(text('NAME', ''))
+        item_data['quantity'] = self.parse_decimal(text('AMOUNT', ''))
+        item_data['weight'] = self.parse_decimal(text('WEIGHT', ''))
+        item_data['discount'] = self.parse_decimal(text('DISCOUNT', ''))
 
         # Unit pricing
-        unit_price_elem = item_elem.find('UNIT_PRICE')
+        unit_price_elem = children.get('UNIT_PRICE')
         if unit_price_elem is not None:
-            item_data['unit_price_with_tax'] = self.parse_decimal(self.get_element_text(unit_price_elem, 'WITH_VAT'))
-            item_data['unit_price_without_tax'] = self.parse_decimal(self.get_element_text(unit_price_elem, 'WITHOUT_VAT'))
-            item_data['unit_tax'] = self.parse_decimal(self.get_element_text(unit_price_elem, 'VAT'))
-            item_data['tax_rate'] = self.parse_decimal(self.get_element_text(unit_price_elem, 'VAT_RATE'))
+            unit_price = self.child_texts(unit_price_elem).get
+            item_data['unit_price_with_tax'] = self.parse_decimal(unit_price('WITH_VAT', ''))
+            item_data['unit_price_without_tax'] = self.parse_decimal(unit_price('WITHOUT_VAT', ''))
+            item_data['unit_tax'] = self.parse_decimal(unit_price('VAT', ''))
+            item_data['tax_rate'] = self.parse_decimal(unit_price('VAT_RATE', ''))
 
         # Total pricing
-        total_price_elem = item_elem.find('TOTAL_PRICE')
+        total_price_elem = children.get('TOTAL_PRICE')
         if total_price_elem is not None:
-            item_data['total_price_with_tax'] = self.parse_decimal(self.get_element_text(total_price_elem, 'WITH_VAT'))
-            item_data['total_price_without_tax'] = self.parse_decimal(self.get_element_text(total_price_elem, 'WITHOUT_VAT'))
-            item_data['total_tax'] = self.parse_decimal(self.get_element_text(total_price_elem, 'VAT'))
-            item_data['item_tax_rate'] = self.parse_decimal(self.get_element_text(total_price_elem, 'VAT_RATE'))
+            total_price = self.child_texts(total_price_elem).get
+            item_data['total_price_with_tax'] = self.parse_decimal(total_price('WITH_VAT', ''))
+            item_data['total_price_without_tax'] = self.parse_decimal(total_price('WITHOUT_VAT', ''))
+            item_data['total_tax'] = self.parse_decimal(total_price('VAT', ''))
+            item_data['item_tax_rate'] = self.parse_decimal(total_price('VAT_RATE', ''))
 
         return item_data
 
@@ -330,79 +505,131 @@ class XMLOrderImporter:
         try:
             billing_address = order_data.get('billing_address', {})
             customer_email = order_data.get('customer_email', '')
-
-            # Determine customer name - prefer company name if available
-            customer_name = billing_address.get('company_name') or billing_address.get('customer_name')
-            if not customer_name:
-                customer_name = customer_email.split('@')[0] if customer_email else f"Customer-{order_data.get('external_order_id', 'Unknown')}"
-
-            # Clean customer name
-            customer_name = self.clean_name(customer_name)
+            customer_name = self.get_customer_name(order_data)
 
             # Check if customer exists by email or name
             existing_customer = None
             if customer_email:
-                existing_customer = frappe.db.get_value("Customer", {"email_id": customer_email}, "name")
+                existing_customer = self.find_customer("email_id", customer_email, self._customer_email_cache)
 
             if not existing_customer and customer_name:
-                existing_customer = frappe.db.get_value("Customer", {"customer_name": customer_name}, "name")
-
-            if existing_customer:
-                # Update existing customer
-                customer_doc = frappe.get_doc("Customer", existing_customer)
-                is_update = True
-            else:
-                # Create new customer
-                customer_doc = frappe.new_doc("Customer")
-                is_update = False
-
-            # Update customer fields
-            customer_doc.customer_name = customer_name
-            customer_doc.customer_type = "Company" if billing_address.get('company_name') else "Individual"
-            customer_doc.customer_group = "All Customer Groups"
-            customer_doc.territory = "Slovakia"
+                existing_customer = self.find_customer("customer_name", customer_name, self._customer_name_cache)
+
+            # Customer fields
+            customer_fields = {
+                "customer_name": customer_name,
+                "customer_type": "Company" if billing_address.get('company_name') else "Individual",
+                "customer_group": "All Customer Groups",
+                "territory": "Slovakia"
+            }
 
             if customer_email:
-                customer_doc.email_id = customer_email
+                customer_fields["email_id"] = customer_email
 
             if order_data.get('customer_phone'):
-                customer_doc.mobile_no = order_data.get('customer_phone')
+                customer_fields["mobile_no"] = order_data.get('customer_phone')
 
             # Tax ID information
             if billing_address.get('vat_id'):
-                customer_doc.tax_id = billing_address.get('vat_id')
+                customer_fields["tax_id"] = billing_address.get('vat_id')
 
             if billing_address.get('company_id'):
-                customer_doc.customer_details = f"Company ID: {billing_address.get('company_id')}"
+                customer_fields["customer_details"] = f"Company ID: {billing_address.get('company_id')}"
 
-            # Save customer
-            if is_update:
+            if existing_customer and self._pending_customer_updates is not None:
+                # Written for the whole batch with one bulk update afterwards
+                self._pending_customer_updates.append((existing_customer, customer_fields))
+                customer_id = existing_customer
+            elif existing_customer:
+                # Update existing customer
+                customer_doc = frappe.get_doc("Customer", existing_customer)
+                customer_doc.update(customer_fields)
                 customer_doc.save(ignore_permissions=True)
+                customer_id = customer_doc.name
             else:
-                customer_doc.insert(ignore_permissions=True)
+                # Create new customer
+                customer_doc = frappe.new_doc("Customer")
+                customer_doc.update(customer_fields)
+                try:
+                    frappe.db.savepoint(CUSTOMER_SAVEPOINT)
+                    customer_doc.insert(ignore_permissions=True)
+                except frappe.DuplicateEntryError:
+                    # Created meanwhile by another worker processing a different shard
+                    frappe.db.rollback(save_point=CUSTOMER_SAVEPOINT)
+                    duplicate_customer = frappe.db.get_value("Customer", {"customer_name": customer_name}, "name")
+                    if not duplicate_customer:
+                        # The conflict was on another unique key, not a concurrently created customer
+                        raise
+                    customer_doc = frappe.get_doc("Customer", duplicate_customer)
+                customer_id = customer_doc.name
+
+            # Later orders from the same customer resolve without a query
+            if customer_email:
+                self._customer_email_cache[customer_email.lower()] = customer_id
+            self._customer_name_cache[customer_name.lower()] = customer_id
 
             # Create or update addresses
-            self.create_customer_addresses(customer_doc.name, order_data)
+            self.create_customer_addresses(customer_id, order_data)
 
-            return customer_doc.name
+            return customer_id
 
         except Exception as e:
             frappe.log_error(f"Failed to create/update customer: {str(e)}")
             return f"Customer-{order_data.get('external_order_id', 'Unknown')}"
 
+    def get_customer_name(self, order_data: Dict[str, Any]) -> str:
+        """Determine the customer name for an order - prefer company name if available"""
+        billing_address = order_data.get('billing_address', {})
+        customer_email = order_data.get('customer_email', '')
+
+        customer_name = billing_address.get('company_name') or billing_address.get('customer_name')
+        if not customer_name:
+            customer_name = customer_email.split('@')[0] if customer_email else f"Customer-{order_data.get('external_order_id', 'Unknown')}"
+
+        # Clean customer name
+        return self.clean_name(customer_name)
+
+    def find_customer(self, fieldname: str, value: str, cache: Dict[str, Optional[str]]) -> Optional[str]:
+        """Look up a Customer by a field value, caching hits and misses for the import"""
+        # The database match is case-insensitive, so the cache is keyed the same way
+        key = value.lower()
+        if key not in cache:
+            cache[key] = frappe.db.get_value("Customer", {fieldname: value}, "name")
+        return cache[key]
+
+    def clear_lookup_caches(self) -> None:
+        """Forget cached lookups, e.g. after a rollback discarded records they point to"""
+        self._customer_email_cache.clear()
+        self._customer_name_cache.clear()
+        self._address_cache.clear()
+        self._checked_address_titles.clear()
+        self._handled_addresses.clear()
+        self._known_items.clear()
+
+    def address_key(self, address_data: Dict[str, Any]) -> tuple:
+        """Build a hashable key from the normalized address fields"""
+        return tuple(cstr(address_data.get(key)).strip().casefold() for key in ADDRESS_KEY_FIELDS)
+
     def create_customer_addresses(self, customer_name: str, order_data: Dict[str, Any]):
         """Create customer addresses"""
         try:
             billing_address = order_data.get('billing_address', {})
             shipping_address = order_data.get('shipping_address', {})
+            billing_key = self.address_key(billing_address)
 
-            # Create billing address
-            if billing_address.get('customer_name') or billing_address.get('street'):
+            # Create billing address unless this customer's address was already handled
+            if (billing_address.get('customer_name') or billing_address.get('street')) and \
+                    (customer_name, "Billing", billing_key) not in self._handled_addresses:
                 self.create_address(customer_name, billing_address, "Billing")
+                self._handled_addresses.add((customer_name, "Billing", billing_key))
 
             # Create shipping address if different from billing
-            if (shipping_address.get('customer_name') or shipping_address.get('street')) and shipping_address != billing_address:
-                self.create_address(customer_name, shipping_address, "Shipping")
+            if shipping_address.get('customer_name') or shipping_address.get('street'):
+                shipping_key = self.address_key(shipping_address)
+                if shipping_key != billing_key and \
+                        (customer_name, "Shipping", shipping_key) not in self._handled_addresses:
+                    self.create_address(customer_name, shipping_address, "Shipping")
+                    self._handled_addresses.add((customer_name, "Shipping", shipping_key))
 
         except Exception as e:
             frappe.log_error(f"Failed to create customer addresses: {str(e)}")
@@ -420,13 +647,19 @@ class XMLOrderImporter:
 
             # Check if address already exists
             address_title = f"{customer_name}-{address_type}"
-            existing_address = frappe.db.get_value("Address", {"address_title": address_title}, "name")
+            # Titles match case-insensitively in the database, so the cache is keyed the same way
+            title_key = address_title.lower()
+            existing_address = self._address_cache.get(title_key)
+            if not existing_address and title_key not in self._checked_address_titles:
+                existing_address = frappe.db.get_value("Address", {"address_title": address_title}, "name")
 
             if existing_address:
+                self._address_cache[title_key] = existing_address
                 return existing_address
 
             # Create new address
-            address_doc = frappe.get_doc({
+            address_doc = frappe.new_doc("Address")
+            address_doc.update({
                 "doctype": "Address",
                 "address_title": address_title,
                 "address_type": address_type,
@@ -441,173 +674,284 @@ class XMLOrderImporter:
             })
 
             address_doc.insert(ignore_permissions=True)
+            self._address_cache[title_key] = address_doc.name
             return address_doc.name
 
         except Exception as e:
             frappe.log_error(f"Failed to create address: {str(e)}")
             return None
 
+    def is_new_order(self, order_data: Dict[str, Any]) -> bool:
+        """Whether create_or_update_order would try to create a Sales Order for the parsed order"""
+        external_order_id = order_data.get('external_order_id')
+        if not external_order_id or external_order_id in self._existing_order_ids:
+            return False
+
+        order_status = order_data.get('order_status', '')
+        return not (order_status and CANCELLED_STATUS_RE.search(order_status))
+
     def create_or_update_order(self, order_data: Dict[str, Any]) -> bool:
         """Create or update ERPNext Sales Order"""
+        pending_customer_updates_mark = len(self._pending_customer_updates or [])
         try:
+            frappe.db.savepoint(ORDER_SAVEPOINT)
+
             external_order_id = order_data.get('external_order_id')
             if not external_order_id:
                 self.add_error("Missing external order ID")
                 return False
 
             # Skip cancelled/storno orders
-            order_status = order_data.get('order_status', '').lower()
-            if 'storno' in order_status or 'cancel' in order_status or 'zrušen' in order_status:
-                frappe.logger().info(f"Skipping cancelled order {external_order_id} with status: {order_data.get('order_status')}")
+            order_status = order_data.get('order_status', '')
+            if order_status and CANCELLED_STATUS_RE.search(order_status):
+                if self._debug:
+                    frappe.logger().info(f"Skipping cancelled order {external_order_id} with status: {order_status}")
                 return True
 
-            # Check if order exists
-            existing_order = frappe.db.get_value("Sales Order", {"po_no": external_order_id}, "name")
+            # Check if order exists (usually answered by the batch prefetch)
+            self.prefetch_existing_orders([external_order_id])
 
-            if existing_order:
+            if external_order_id in self._existing_order_ids:
                 # Skip if order already exists
-                frappe.logger().info(f"Order {external_order_id} already exists, skipping")
+                if self._debug:
+                    frappe.logger().info(f"Order {external_order_id} already exists, skipping")
                 return True
 
             # Create customer
             customer_name = self.create_or_update_customer(order_data)
 
+            # Only product items are added to the sales order
+            product_items = [
+                item_data for item_data in order_data.get('order_items', [])
+                if item_data.get('item_type') == 'product'
+            ]
+
+            # Build all rows before the Sales Order is created, so orders without
+            # any usable product line are skipped without building a document
+            item_rows = []
+            if product_items:
+                # Check which items exist with one query per order
+                existing_items = self.get_existing_items(product_items)
+                for item_data in product_items:
+                    row = self.build_order_item_row(item_data, existing_items)
+                    if row:
+                        item_rows.append(row)
+
+            # Only create order if we have product items
+            if not item_rows:
+                if self._debug:
+                    frappe.logger().info(f"No valid product items found for order {external_order_id}, skipping")
+                return True
+
             # Parse order date
             order_date = get_datetime(order_data.get('order_date', now()))
+            order_day = order_date.date()
 
             # Create Sales Order
             sales_order = frappe.new_doc("Sales Order")
             sales_order.customer = customer_name
-            sales_order.transaction_date = order_date.date()
-            sales_order.delivery_date = order_date.date()
+            sales_order.transaction_date = order_day
+            sales_order.delivery_date = order_day
             sales_order.company = self.company
             sales_order.currency = order_data.get('currency_code', 'EUR')
-            sales_order.selling_price_list = "Standard Selling"
+            sales_order.selling_price_list = SELLING_PRICE_LIST
 
             # Use po_no field for external order ID tracking (standard ERPNext field)
             sales_order.po_no = external_order_id
-            sales_order.po_date = order_date.date()
+            sales_order.po_date = order_day
 
             # Add customer remarks
-            if order_data.get('customer_remark'):
-                sales_order.remarks = order_data.get('customer_remark')
-
-            # Process order items
-            product_items_added = 0
-            for item_data in order_data.get('order_items', []):
-                # Only add product items to sales order
-                if item_data.get('item_type') == 'product':
-                    if self.add_order_item(sales_order, item_data):
-                        product_items_added += 1
-
-            # Only create order if we have product items
-            if product_items_added == 0:
-                frappe.logger().info(f"No valid product items found for order {external_order_id}, skipping")
-                return True
+            customer_remark = order_data.get('customer_remark')
+            if customer_remark:
+                sales_order.remarks = customer_remark
 
-            # Set totals
-            sales_order.run_method("calculate_taxes_and_totals")
+            sales_order.extend("items", item_rows)
 
-            # Save order
+            # Save order; validation on insert calculates taxes and totals
             sales_order.insert(ignore_permissions=True)
 
             # Auto-submit if configuration allows
             if self.config and self.config.get('auto_submit_orders'):
                 try:
                     sales_order.submit()
-                    frappe.logger().info(f"Auto-submitted Sales Order: {sales_order.name}")
+                    if self._debug:
+                        frappe.logger().info(f"Auto-submitted Sales Order: {sales_order.name}")
                 except Exception as e:
                     frappe.logger().warning(f"Failed to auto-submit order {sales_order.name}: {str(e)}")
                     # Continue even if submit fails - order is still created
             else:
-                frappe.logger().info(f"Order {sales_order.name} saved as draft (auto-submit disabled)")
+                if self._debug:
+                    frappe.logger().info(f"Order {sales_order.name} saved as draft (auto-submit disabled)")
 
+            self._existing_order_ids.add(external_order_id)
             self.imported_count += 1
-            frappe.logger().info(f"Created Sales Order: {sales_order.name} for external order {external_order_id}")
+            if self._debug:
+                frappe.logger().info(f"Created Sales Order: {sales_order.name} for external order {external_order_id}")
 
             return True
 
         except Exception as e:
-            frappe.db.rollback()
+            # Only discard this order, not the rest of the uncommitted batch
+            frappe.db.rollback(save_point=ORDER_SAVEPOINT)
+            if self._pending_customer_updates:
+                del self._pending_customer_updates[pending_customer_updates_mark:]
+            self.clear_lookup_caches()
             error_msg = f"Failed to process order {order_data.get('external_order_id', 'Unknown')}: {str(e)}"
             self.add_error(error_msg)
-            frappe.log_error(error_msg)
+            if self._debug:
+                frappe.log_error(error_msg)
             return False
 
-    def add_order_item(self, sales_order: Document, item_data: Dict[str, Any]) -> bool:
-        """Add item to sales order"""
+    def prefetch_existing_orders(self, external_order_ids: List[str]) -> None:
+        """Look up which external order IDs already have a Sales Order, one query per PREFETCH_CHUNK_SIZE IDs"""
+        order_ids = list({
+            order_id for order_id in external_order_ids
+            if order_id and order_id not in self._checked_order_ids
+        })
+        for start in range(0, len(order_ids), PREFETCH_CHUNK_SIZE):
+            chunk = order_ids[start:start + PREFETCH_CHUNK_SIZE]
+            self._existing_order_ids.update(
+                frappe.get_all("Sales Order", filters={"po_no": ["in", chunk]}, pluck="po_no")
+            )
+            self._checked_order_ids.update(chunk)
+
+    def prefetch_customers(self, emails: List[str]) -> None:
+        """Load the Customers matching the given emails into the email lookup cache"""
+        emails = list({
+            email.lower() for email in emails
+            if email and email.lower() not in self._customer_email_cache
+        })
+        if not emails:
+            return
+
+        for email in emails:
+            self._customer_email_cache[email] = None
+        for customer in frappe.get_all(
+            "Customer",
+            filters={"email_id": ["in", emails]},
+            fields=["name", "email_id"],
+            order_by="modified desc"
+        ):
+            # Keep the most recently modified match, like frappe.db.get_value
+            email = customer.email_id.lower()
+            if not self._customer_email_cache.get(email):
+                self._customer_email_cache[email] = customer.name
+
+    def prefetch_addresses(self, batch: List[Dict[str, Any]]) -> None:
+        """Load existing billing/shipping Addresses of the batch's likely customers in one query"""
+        customers = set()
+        for order_data in batch:
+            customers.add(self.get_customer_name(order_data))
+            customer_email = cstr(order_data.get('customer_email')).lower()
+            if self._customer_email_cache.get(customer_email):
+                customers.add(self._customer_email_cache[customer_email])
+
+        address_titles = [
+            f"{customer}-{address_type}".lower() for customer in customers for address_type in ("Billing", "Shipping")
+        ]
+        address_titles = [
+            title for title in address_titles
+            if title not in self._address_cache and title not in self._checked_address_titles
+        ]
+        if not address_titles:
+            return
+
+        for address in frappe.get_all(
+            "Address", filters={"address_title": ["in", address_titles]}, fields=["name", "address_title"]
+        ):
+            self._address_cache.setdefault(address.address_title.lower(), address.name)
+        self._checked_address_titles.update(address_titles)
+
+    def get_existing_items(self, order_items: List[Dict[str, Any]]) -> set:
+        """
+        Return the set of item codes known to exist as Items
+
+        Only codes from the given order lines that have not been seen earlier in
+        the import are queried, in a single query.
+        """
+        item_codes = list({
+            item_data.get('item_code') for item_data in order_items
+            if item_data.get('item_code') and item_data.get('item_code') not in self._known_items
+        })
+        if item_codes:
+            self._known_items.update(frappe.get_all("Item", filters={"name": ["in", item_codes]}, pluck="name"))
+
+        return self._known_items
+
+    def build_order_item_row(self, item_data: Dict[str, Any], existing_items: set) -> Optional[Dict[str, Any]]:
+        """Build a Sales Order Item row for an order line, creating a placeholder item if needed"""
+        item_code = item_data.get('item_code')
         try:
-            item_code = item_data.get('item_code')
             if not item_code:
                 frappe.logger().warning(f"No item code found for item: {item_data.get('item_name')}")
-                return False
+                return None
 
-            # Check if item exists in ERPNext
-            if not frappe.db.exists("Item", item_code):
+            if item_code not in existing_items:
                 # Create a placeholder item if it doesn't exist
                 if not self.create_placeholder_item(item_code, item_data):
-                    return False
-
-            # Add item to sales order
-            item_row = sales_order.append("items", {})
-            item_row.item_code = item_code
-            item_row.item_name = item_data.get('item_name', item_code)
-            item_row.qty = item_data.get('quantity', 1)
-            item_row.rate = item_data.get('unit_price_without_tax', 0)
+                    return None
+                existing_items.add(item_code)
 
-            # If rate is 0, try to get it from with_tax price
-            if item_row.rate == 0:
-                item_row.rate = item_data.get('unit_price_with_tax', 0)
-
-            # Calculate amount
-            item_row.amount = item_row.qty * item_row.rate
+            qty = item_data.get('quantity', 1)
+            # If the price without tax is 0, fall back to the with_tax price
+            rate = item_data.get('unit_price_without_tax', 0) or item_data.get('unit_price_with_tax', 0)
 
             # Set UOM
             uom = item_data.get('unit', 'Nos')
-            if uom == 'ks':  # Slovak for pieces
-                uom = 'Nos'
-            item_row.uom = uom
+            uom = UOM_MAP.get(uom, uom)
 
-            # Set warehouse (get default)
-            default_warehouse = frappe.db.get_single_value("Stock Settings", "default_warehouse")
-            if default_warehouse:
-                item_row.warehouse = default_warehouse
+            row = {
+                "item_code": item_code,
+                "item_name": item_data.get('item_name', item_code),
+                "qty": qty,
+                "rate": rate,
+                "amount": qty * rate,
+                "uom": uom,
+            }
 
-            frappe.logger().info(f"Added item {item_code} to sales order")
-            return True
+            # Set warehouse (default read once in __init__)
+            if self.default_warehouse:
+                row["warehouse"] = self.default_warehouse
 
-        except Exception as e:
-            frappe.log_error(f"Failed to add order item {item_data.get('item_code')}: {str(e)}")
-            return False
+            frappe.logger().debug(f"Added item {item_code} to sales order")
+            return row
 
-    def create_placeholder_item(self, item_code: str, item_data: Dict[str, Any]) -> bool:
-        """Create placeholder item if it doesn't exist"""
-        try:
-            # Clean item name
-            item_name = item_data.get('item_name', item_code)
-            if len(item_name) > 140:  # ERPNext limit
-                item_name = item_name[:137] + "..."
+        except Exception as e:
+            frappe.log_error(f"Failed to add order item {item_code}: {str(e)}")
+            return None
 
-            item_doc = frappe.get_doc({
-                "doctype": "Item",
-                "item_code": item_code,
-                "item_name": item_name,
-                "item_group": "All Item Groups",
-                "stock_uom": "Nos",
-                "is_stock_item": 1,
-                "is_sales_item": 1,
-                "is_purchase_item": 0,
-                "description": f"Auto-created from order import: {item_name}"
+    def build_placeholder_item(self, item_code: str, item_data: Dict[str, Any]) -> Document:
+        """Build an unsaved placeholder Item for an order line"""
+        # Clean item name
+        item_name = item_data.get('item_name', item_code)
+        if len(item_name) > 140:  # ERPNext limit
+            item_name = item_name[:137] + "..."
+
+        item_doc = frappe.new_doc("Item")
+        item_doc.update({
+            "item_code": item_code,
+            "item_name": item_name,
+            "item_group": "All Item Groups",
+            "stock_uom": "Nos",
+            "is_stock_item": 1,
+            "is_sales_item": 1,
+            "is_purchase_item": 0,
+            "description": f"Auto-created from order import: {item_name}"
+        })
+
+        # Add barcode if available
+        if item_data.get('barcode'):
+            item_doc.append("barcodes", {
+                "barcode": item_data.get('barcode'),
+                "barcode_type": "EAN"
             })
 
-            # Add barcode if available
-            if item_data.get('barcode'):
-                item_doc.append("barcodes", {
-                    "barcode": item_data.get('barcode'),
-                    "barcode_type": "EAN"
-                })
+        return item_doc
 
-            item_doc.insert(ignore_permissions=True)
+    def create_placeholder_item(self, item_code: str, item_data: Dict[str, Any]) -> bool:
+        """Create placeholder item if it doesn't exist"""
+        try:
+            self.build_placeholder_item(item_code, item_data).insert(ignore_permissions=True)
             frappe.logger().info(f"Created placeholder item: {item_code}")
             return True
 
@@ -615,18 +959,130 @@ class XMLOrderImporter:
             frappe.log_error(f"Failed to create placeholder item {item_code}: {str(e)}")
             return False
 
+    def create_placeholder_items(self, order_items: List[Dict[str, Any]]) -> None:
+        """Create placeholder Items for all unknown item codes of a batch in bulk"""
+        item_docs = {}
+        for item_data in order_items:
+            item_code = item_data.get('item_code')
+            if item_code and item_code not in self._known_items and item_code not in item_docs:
+                try:
+                    item_docs[item_code] = self.prepare_for_bulk_insert(
+                        self.build_placeholder_item(item_code, item_data)
+                    )
+                except Exception as e:
+                    frappe.log_error(f"Failed to create placeholder item {item_code}: {str(e)}")
+
+        if item_docs:
+            inserted = self.bulk_insert_documents("Item", list(item_docs.values()))
+            self._known_items.update(item_doc.item_code for item_doc in inserted)
+            frappe.logger().info(f"Created {len(inserted)} placeholder items")
+
+    def bulk_update_customers(self, customer_updates: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Write queued customer field updates with chunked multi-row UPDATEs"""
+        # bulk_update does not touch the modification stamp, so it is written explicitly
+        modified = {"modified": now(), "modified_by": frappe.session.user}
+        doc_updates = {}
+        for customer, fields in customer_updates:
+            doc_updates.setdefault(customer, {}).update(fields)
+        for fields in doc_updates.values():
+            fields.update(modified)
+
+        try:
+            frappe.db.savepoint(BULK_WRITE_SAVEPOINT)
+            # Deliberately skips Customer.validate, on_update hooks and version tracking: these
+            # are plain contact/tax fields copied from the feed for customers that already exist
+            frappe.db.bulk_update("Customer", doc_updates, chunk_size=CUSTOMER_UPDATE_CHUNK_SIZE)
+        except Exception as e:
+            frappe.db.rollback(save_point=BULK_WRITE_SAVEPOINT)
+            frappe.log_error(f"Failed to update {len(doc_updates)} customers: {str(e)}")
+
+    def prepare_for_bulk_insert(self, doc: Document) -> Document:
+        """Name a new document and set the fields insert() would, for use with bulk_insert"""
+        doc.set_new_name()
+        doc.set_parent_in_children()
+        doc.owner = doc.modified_by = frappe.session.user
+        doc.creation = doc.modified = now()
+        for child in doc.get_all_children():
+            child.owner = child.modified_by = doc.owner
+            child.creation = child.modified = doc.creation
+        return doc
+
+    def bulk_insert_documents(self, doctype: str, docs: List[Document]) -> List[Document]:
+        """
+        Insert prepared documents with multi-row INSERTs and return the inserted ones
+
+        Document hooks do not run. If the bulk insert fails, the documents are
+        inserted one by one so a single bad row does not lose the others.
+        """
+        try:
+            frappe.db.savepoint(BULK_WRITE_SAVEPOINT)
+            bulk_insert(doctype, docs, chunk_size=BULK_INSERT_CHUNK_SIZE)
+            return docs
+        except Exception as e:
+            frappe.db.rollback(save_point=BULK_WRITE_SAVEPOINT)
+            frappe.log_error(f"Bulk insert of {len(docs)} {doctype} records failed, inserting one by one: {str(e)}")
+
+        inserted = []
+        for doc in docs:
+            try:
+                doc.insert(ignore_permissions=True)
+                inserted.append(doc)
+            except Exception as e:
+                frappe.log_error(f"Failed to insert {doctype} {doc.name}: {str(e)}")
+        return inserted
+
     def add_error(self, error_msg: str) -> None:
-        """Add error to error list"""
-        self.errors.append(error_msg)
+        """Add error to error list, keeping only the first MAX_COLLECTED_ERRORS messages"""
+        if len(self.errors) < MAX_COLLECTED_ERRORS:
+            self.errors.append(error_msg)
         self.error_count += 1
 
-    def process_xml_content(self, xml_content: str) -> Dict[str, Any]:
+    def log_collected_errors(self) -> None:
+        """Write the errors collected during the import to a single Error Log entry"""
+        # Identical messages (e.g. the same missing master data) are written once
+        messages = list(dict.fromkeys(self.errors))
+        if not messages:
+            return
+
+        details = "\n".join(messages)
+        if self.error_count > len(self.errors):
+            details += f"\n... and {self.error_count - len(self.errors)} more"
+        frappe.log_error(title=f"XML Order Import: {self.error_count} errors", message=details)
+
+    @staticmethod
+    def find_order_elements(root) -> List[Any]:
+        """Find order elements in a parsed tree, matching tag names case-insensitively"""
+        # Single walk of the tree; lxml yields comments and processing instructions too
+        order_elements = [
+            elem for elem in root.iter()
+            if isinstance(elem.tag, str) and elem.tag.lower() in ORDER_ELEMENT_TAGS
+        ]
+
+        # If still no elements found and root is ORDERS, check direct children
+        if not order_elements and root.tag.upper() == 'ORDERS':
+            order_elements = [
+                child for child in root
+                if isinstance(child.tag, str) and 'order' in child.tag.lower()
+            ]
+
+        return order_elements
+
+    def process_xml_content(self, xml_content: Union[str, bytes]) -> Dict[str, Any]:
         """Process XML content directly (for pasted content debugging)"""
         try:
             frappe.logger().info("Processing pasted XML content for order import")
 
+            # Pasted text is encoded once here; fetched bytes go to the parser as they are
+            if isinstance(xml_content, str):
+                xml_content = xml_content.encode('utf-8')
+
+            # Strip leading whitespace once (it would misplace the XML declaration);
+            # unchanged content is not copied, and the result is what gets parsed
+            if xml_content:
+                xml_content = xml_content.lstrip()
+
             # Check if content is meaningful
-            if not xml_content or len(xml_content.strip()) < 50:
+            if not xml_content or len(xml_content) < 50:
                 return {
                     "success": False,
                     "error": f"XML content is empty or too small: {len(xml_content) if xml_content else 0} bytes",
@@ -636,7 +1092,7 @@ class XMLOrderImporter:
 
             # Parse XML
             try:
-                root = ET.fromstring(xml_content.strip())
+                root = ET.fromstring(xml_content, ET.XMLParser(**XML_PARSER_OPTIONS))
                 frappe.logger().info(f"Successfully parsed XML with root element: {root.tag}")
             except ET.ParseError as e:
                 error_msg = f"Failed to parse XML: {str(e)}"
@@ -652,16 +1108,7 @@ class XMLOrderImporter:
             imported_orders = []
             processing_errors = []
 
-            # Find order elements - try multiple possible names
-            order_elements = (root.findall('.//order') or
-                            root.findall('.//Order') or
-                            root.findall('.//ORDER') or
-                            root.findall('.//objednavka') or  # Slovak for order
-                            root.findall('.//OBJEDNAVKA'))
-
-            # If still no elements found and root is ORDERS, check direct children
-            if not order_elements and root.tag.upper() == 'ORDERS':
-                order_elements = [child for child in root if child.tag.lower() in ['order', 'objednavka'] or 'order' in child.tag.lower()]
+            order_elements = self.find_order_elements(root)
 
             frappe.logger().info(f"Found {len(order_elements)} order elements to process")
             frappe.logger().info(f"Root tag: {root.tag}, Direct children: {[child.tag for child in root[:5]]}")  # Log first 5 children
@@ -696,6 +1143,9 @@ class XMLOrderImporter:
                     frappe.logger().error(error_msg)
                     frappe.log_error(f"Order processing error: {str(e)}", "XML Order Import")
 
+            # Failures collected by create_or_update_order are only logged here unless debugging
+            self.log_collected_errors()
+
             # Prepare summary
             success = len(imported_orders) > 0
             summary = {
@@ -720,17 +1170,124 @@ class XMLOrderImporter:
                 "errors": [error_msg]
             }
 
+    def process_order_batch(self, batch: List[Dict[str, Any]]) -> int:
+        """Import a batch of parsed orders and return how many were processed"""
+        # Answer the per-order existence checks with one query each for the whole batch
+        self.prefetch_existing_orders([order_data.get('external_order_id') for order_data in batch])
+        self.prefetch_customers([order_data.get('customer_email') for order_data in batch])
+        self.prefetch_addresses(batch)
+
+        # Only orders that will be created need their items; skipped ones get no placeholders
+        new_order_ids = set()
+        product_items = []
+        for order_data in batch:
+            external_order_id = order_data.get('external_order_id')
+            if external_order_id in new_order_ids or not self.is_new_order(order_data):
+                continue
+            new_order_ids.add(external_order_id)
+            product_items.extend(
+                item_data for item_data in order_data.get('order_items', [])
+                if item_data.get('item_type') == 'product'
+            )
+        self.get_existing_items(product_items)
+
+        # Orders link to their items, so missing ones must exist before any order is saved
+        self.create_placeholder_items(product_items)
+
+        self._pending_customer_updates = []
+        processed_count = 0
+        for order_data in batch:
+            order_id = order_data.get('external_order_id', 'Unknown')
+            try:
+                if self._debug:
+                    # Log order items for debugging
+                    items = order_data.get('order_items', [])
+                    product_count = sum(1 for item in items if item.get('item_type') == 'product')
+                    frappe.logger().info(f"Processing order {order_id} with status: {order_data.get('order_status', 'Unknown')}")
+                    frappe.logger().info(f"Order {order_id} has {len(items)} total items, {product_count} product items")
+
+                if self.create_or_update_order(order_data):
+                    processed_count += 1
+
+            except Exception as e:
+                error_msg = f"Error processing ORDER ID {order_id}: {str(e)}"
+                self.add_error(error_msg)
+                if self._debug:
+                    frappe.log_error(error_msg)
+
+        pending_customer_updates, self._pending_customer_updates = self._pending_customer_updates, None
+        if pending_customer_updates:
+            self.bulk_update_customers(pending_customer_updates)
+
+        return processed_count
+
+    def enqueue_order_shard(self, order_chunks: List[str]) -> None:
+        """Queue serialized ORDER elements for a background worker"""
+        frappe.enqueue(
+            "xml_importer.xml_importer.order_importer.process_order_shard",
+            queue="long",
+            order_chunks=order_chunks,
+            xml_source=self.xml_source,
+            company=self.company,
+            config_name=self.config.name if self.config else None,
+            config_doctype=self.config.doctype if self.config else None
+        )
+
     def import_from_xml(self) -> Dict[str, Any]:
         """Main import function"""
         try:
             frappe.logger().info(f"Starting XML order import from: {self.xml_source}")
 
-            # Fetch and parse XML
-            xml_content = self.fetch_xml_content()
-
-            # Check if content is meaningful
-            if not xml_content or len(xml_content.strip()) < 50:
-                frappe.logger().warning(f"XML content is empty or too small: {len(xml_content) if xml_content else 0} bytes")
+            # Stream and parse XML one ORDER at a time
+            total_orders = 0
+            processed_count = 0
+            batch = []
+            shard = []
+            queued_shards = 0
+            with self.open_xml_stream() as stream:
+                try:
+                    for order in self.iter_orders(stream):
+                        total_orders += 1
+                        if total_orders % ORDER_LOG_INTERVAL == 0:
+                            frappe.logger().info(f"Read {total_orders} orders from XML feed")
+
+                        if not self.sync:
+                            # Serialize now, the element is cleared once the loop moves on
+                            shard.append(ET.tostring(order, encoding='unicode'))
+                            if len(shard) >= self.commit_batch_size:
+                                self.enqueue_order_shard(shard)
+                                queued_shards += 1
+                                shard = []
+                            continue
+
+                        try:
+                            batch.append(self.parse_order(order))
+                        except Exception as e:
+                            order_id = order.findtext('ORDER_ID') or 'Unknown'
+                            error_msg = f"Error processing ORDER ID {order_id}: {str(e)}"
+                            self.add_error(error_msg)
+                            if self._debug:
+                                frappe.log_error(error_msg)
+                            continue
+
+                        # Process and commit in batches instead of per order
+                        if len(batch) >= self.commit_batch_size:
+                            processed_count += self.process_order_batch(batch)
+                            batch = []
+                            frappe.db.commit()
+
+                except ET.ParseError as e:
+                    frappe.throw(f"XML parsing failed: {str(e)}")
+
+            if batch:
+                processed_count += self.process_order_batch(batch)
+
+            if shard:
+                self.enqueue_order_shard(shard)
+                queued_shards += 1
+
+            if not total_orders:
+                frappe.logger().warning("XML feed contains no orders")
                 return {
                     "success": True,  # It's "successful" but no data to process
                     "imported": 0,
@@ -741,36 +1298,22 @@ class XMLOrderImporter:
                     "successfully_processed": 0
                 }
 
-            root = self.parse_xml(xml_content)
-
-            # Find all ORDER elements
-            orders = root.findall('.//ORDER')
-
-            frappe.logger().info(f"Found {len(orders)} orders to process")
-
-            # Process each order
-            processed_count = 0
-            for order in orders:
-                try:
-                    order_data = self.parse_order(order)
-                    order_id = order_data.get('external_order_id', 'Unknown')
-                    order_status = order_data.get('order_status', 'Unknown')
-
-                    frappe.logger().info(f"Processing order {order_id} with status: {order_status}")
-
-                    # Log order items for debugging
-                    items = order_data.get('order_items', [])
-                    product_items = [item for item in items if item.get('item_type') == 'product']
-                    frappe.logger().info(f"Order {order_id} has {len(items)} total items, {len(product_items)} product items")
-
-                    if self.create_or_update_order(order_data):
-                        processed_count += 1
+            if not self.sync:
+                frappe.logger().info(f"Queued {total_orders} orders from XML feed in {queued_shards} shards")
+                return {
+                    "success": True,
+                    "queued": True,
+                    "imported": 0,
+                    "updated": 0,
+                    "errors": 0,
+                    "error_messages": [],
+                    "total_processed": total_orders,
+                    "queued_shards": queued_shards
+                }
 
-                except Exception as e:
-                    error_msg = f"Error processing ORDER ID {order.find('ORDER_ID').text if order.find('ORDER_ID') is not None else 'Unknown'}: {str(e)}"
-                    self.add_error(error_msg)
-                    frappe.log_error(error_msg)
-                    continue
+            self.log_collected_errors()
+            frappe.db.commit()
+            frappe.logger().info(f"Processed {total_orders} orders from XML feed")
 
             # Return summary
             summary = {
@@ -779,7 +1322,7 @@ class XMLOrderImporter:
                 "updated": self.updated_count,
                 "errors": self.error_count,
                 "error_messages": self.errors[:10],  # First 10 errors
-                "total_processed": len(orders),
+                "total_processed": total_orders,
                 "successfully_processed": processed_count
             }
 
@@ -800,21 +1343,71 @@ class XMLOrderImporter:
 
 # Public API functions
 @frappe.whitelist()
-def import_xml_orders(xml_source: str, company: str = None) -> Dict[str, Any]:
+def import_xml_orders(xml_source: str, company: str = None, sync=True, config=None) -> Dict[str, Any]:
     """
     Import orders from XML feed
 
     Args:
         xml_source: URL or file path to XML feed
         company: Company name (optional)
+        sync: Process orders in this request; otherwise enqueue them in shards
+        config: Configuration document, or XML Import Configuration name (optional)
 
     Returns:
         Dict with import results
     """
-    importer = XMLOrderImporter(xml_source, company)
+    if isinstance(config, str):
+        config = frappe.get_doc("XML Import Configuration", config)
+    importer = XMLOrderImporter(xml_source, company, config=config, sync=sbool(sync))
     return importer.import_from_xml()
 
 
+def process_order_shard(order_chunks: List[str], xml_source: str = None, company: str = None,
+                        config_name: str = None, config_doctype: str = None) -> Dict[str, Any]:
+    """
+    Background job importing a shard of serialized ORDER elements
+
+    Args:
+        order_chunks: ORDER elements serialized by XMLOrderImporter.import_from_xml
+        xml_source: Feed the orders came from, for logging
+        company: Company name (optional)
+        config_name: Configuration the import was started from (optional)
+        config_doctype: DocType of that configuration (default: XML Import Configuration)
+
+    Returns:
+        Dict with shard results
+    """
+    config = (
+        frappe.get_doc(config_doctype or "XML Import Configuration", config_name) if config_name else None
+    )
+    importer = XMLOrderImporter(xml_source, company, config=config)
+
+    batch = []
+    for chunk in order_chunks:
+        try:
+            batch.append(importer.parse_order(ET.fromstring(chunk, ET.XMLParser(**XML_PARSER_OPTIONS))))
+        except Exception as e:
+            error_msg = f"Error processing queued order from {xml_source}: {str(e)}"
+            importer.add_error(error_msg)
+            if importer._debug:
+                frappe.log_error(error_msg)
+
+    processed_count = importer.process_order_batch(batch)
+    importer.log_collected_errors()
+    frappe.db.commit()
+
+    summary = {
+        "success": True,
+        "imported": importer.imported_count,
+        "errors": importer.error_count,
+        "error_messages": importer.errors[:10],
+        "total_processed": len(order_chunks),
+        "successfully_processed": processed_count
+    }
+    frappe.logger().info(f"Order shard import completed: {summary}")
+    return summary
+
+
 def scheduled_xml_order_import():
     """
     Scheduled function to import XML orders
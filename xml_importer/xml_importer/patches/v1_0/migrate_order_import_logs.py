@@ -1,4 +1,5 @@
 import frappe
+from frappe.utils import now
 
 def execute():
     """
@@ -7,45 +8,38 @@ def execute():
     if not frappe.db.exists("DocType", "XML Order Import Log"):
         return
 
-    try:
-        # Get all XML Order Import Log records
-        order_logs = frappe.get_all("XML Order Import Log",
-            fields=["name", "import_date", "xml_source", "status", "orders_imported",
-                   "orders_updated", "errors", "error_details", "summary"])
-
-        for log in order_logs:
-            # Check if this record was already migrated
-            existing = frappe.db.exists("XML Import Log", {
-                "xml_source": log.xml_source,
-                "import_datetime": log.import_date,
-                "import_type": "Orders"
-            })
-
-            if not existing:
-                # Create corresponding XML Import Log entry
-                try:
-                    new_log = frappe.get_doc({
-                        "doctype": "XML Import Log",
-                        "import_datetime": log.import_date,
-                        "import_type": "Orders",
-                        "xml_source": log.xml_source,
-                        "status": log.status,
-                        "records_imported": log.orders_imported or 0,
-                        "records_updated": log.orders_updated or 0,
-                        "error_count": log.errors or 0,
-                        "total_processed": (log.orders_imported or 0) + (log.orders_updated or 0),
-                        "error_message": log.error_details or "",
-                        "summary": log.summary or "{}"
-                    })
-                    new_log.insert(ignore_permissions=True)
-
-                except Exception as e:
-                    print(f"Warning: Could not migrate order log {log.name}: {str(e)}")
-
-        if order_logs:
-            print(f"✅ Migrated {len(order_logs)} XML Order Import Log records to unified XML Import Log")
-
-    except Exception as e:
-        print(f"Warning: Error during XML Order Import Log migration: {str(e)}")
+    # Copy all records that were not migrated yet with one INSERT ... SELECT;
+    # migrated entries keep the legacy name with a prefix instead of a new series number.
+    # Errors are not caught so a failed copy stops the migration instead of half-running it
+    frappe.db.sql("""
+        INSERT INTO `tabXML Import Log` (
+            name, naming_series, import_datetime, import_type, xml_source, status,
+            records_imported, records_updated, error_count, total_processed,
+            error_message, summary, creation, modified, owner, modified_by, docstatus
+        )
+        SELECT
+            CONCAT('migrated-', l.name), 'XMLIMP-.YYYY.-.MM.-.DD.-.####', l.import_date, 'Orders',
+            l.xml_source, l.status,
+            COALESCE(l.orders_imported, 0), COALESCE(l.orders_updated, 0), COALESCE(l.errors, 0),
+            COALESCE(l.orders_imported, 0) + COALESCE(l.orders_updated, 0),
+            COALESCE(l.error_details, ''), COALESCE(l.summary, '{}'),
+            %(now)s, %(now)s, %(user)s, %(user)s, 0
+        FROM `tabXML Order Import Log` l
+        WHERE NOT EXISTS (
+            SELECT 1 FROM `tabXML Import Log` n
+            WHERE (n.xml_source = l.xml_source OR (n.xml_source IS NULL AND l.xml_source IS NULL))
+                AND (n.import_datetime = l.import_date OR (n.import_datetime IS NULL AND l.import_date IS NULL))
+                AND n.import_type = 'Orders'
+        )
+            AND NOT EXISTS (
+                SELECT 1 FROM `tabXML Import Log` m
+                WHERE m.name = CONCAT('migrated-', l.name)
+            )
+    """, {"now": now(), "user": frappe.session.user})
+
+    # Rows written by the INSERT above, as reported by the database driver
+    migrated_count = frappe.db._cursor.rowcount
+    if migrated_count:
+        print(f"✅ Migrated {migrated_count} XML Order Import Log records to unified XML Import Log")
 
     frappe.db.commit()
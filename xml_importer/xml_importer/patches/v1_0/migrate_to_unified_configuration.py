@@ -4,6 +4,14 @@ def execute():
     """
     Migrate existing XML Import Settings to new unified XML Import Configuration
     """
+    # (import_type, xml_feed_url) of configurations that already exist, read with one query
+    existing_configs = {
+        (config.import_type, config.xml_feed_url)
+        for config in frappe.get_all("XML Import Configuration",
+            filters={"import_type": ["in", ["Items", "Orders"]]},
+            fields=["import_type", "xml_feed_url"])
+    }
+
     # Check if old XML Import Settings exists
     if frappe.db.exists("DocType", "XML Import Settings"):
         try:
@@ -11,12 +19,7 @@ def execute():
 
             # Create new XML Import Configuration for Items
             if settings.xml_feed_url:
-                existing_config = frappe.db.exists("XML Import Configuration", {
-                    "import_type": "Items",
-                    "xml_feed_url": settings.xml_feed_url
-                })
-
-                if not existing_config:
+                if ("Items", settings.xml_feed_url) not in existing_configs:
                     config_doc = frappe.get_doc({
                         "doctype": "XML Import Configuration",
                         "name": "Item Import Configuration",
@@ -50,12 +53,7 @@ def execute():
 
             # Create new XML Import Configuration for Orders
             if settings.xml_feed_url:
-                existing_config = frappe.db.exists("XML Import Configuration", {
-                    "import_type": "Orders",
-                    "xml_feed_url": settings.xml_feed_url
-                })
-
-                if not existing_config:
+                if ("Orders", settings.xml_feed_url) not in existing_configs:
                     config_doc = frappe.get_doc({
                         "doctype": "XML Import Configuration",
                         "name": "Order Import Configuration",
@@ -77,4 +75,5 @@ def execute():
         except Exception as e:
             print(f"Warning: Could not migrate XML Order Import Settings: {str(e)}")
 
+    # Both configurations are written in the patch's transaction and committed together
     frappe.db.commit()
@@ -1,6 +1,13 @@
 import frappe
 from frappe.model.utils.rename_field import rename_field
 
+# Fields renamed after the app rename: (old column, new column, value to keep when both exist)
+RENAMED_FIELDS = (
+    ("items_imported", "records_imported", "COALESCE(NULLIF(records_imported, 0), items_imported)"),
+    ("items_updated", "records_updated", "COALESCE(NULLIF(records_updated, 0), items_updated)"),
+    ("import_date", "import_datetime", "COALESCE(import_datetime, import_date)"),
+)
+
 def execute():
     """
     Migrate XML Import Log fields after app rename from xml_item_importer to xml_importer
@@ -8,26 +15,29 @@ def execute():
     if not frappe.db.exists("DocType", "XML Import Log"):
         return
 
+    # Values backfilled for existing records, all written by one UPDATE
+    assignments = []
+
     # Add import_type field with default value for existing records
     if not frappe.db.has_column("XML Import Log", "import_type"):
         frappe.reload_doc("XML Importer", "doctype", "XML Import Log")
-
-        # Set default import_type for existing records
-        frappe.db.sql("""
-            UPDATE `tabXML Import Log`
-            SET import_type = 'Items'
-            WHERE import_type IS NULL OR import_type = ''
-        """)
+        assignments.append("import_type = COALESCE(NULLIF(import_type, ''), 'Items')")
 
     # Rename field names if they exist with old names
-    if frappe.db.has_column("XML Import Log", "items_imported") and not frappe.db.has_column("XML Import Log", "records_imported"):
-        rename_field("XML Import Log", "items_imported", "records_imported")
+    for old_field, new_field, merged_value in RENAMED_FIELDS:
+        if not frappe.db.has_column("XML Import Log", old_field):
+            continue
 
-    if frappe.db.has_column("XML Import Log", "items_updated") and not frappe.db.has_column("XML Import Log", "records_updated"):
-        rename_field("XML Import Log", "items_updated", "records_updated")
+        if frappe.db.has_column("XML Import Log", new_field):
+            # The reload above already added the new column, copy the old values into it
+            assignments.append(f"{new_field} = {merged_value}")
+        else:
+            rename_field("XML Import Log", old_field, new_field)
 
-    # Update import_date to import_datetime if needed
-    if frappe.db.has_column("XML Import Log", "import_date") and not frappe.db.has_column("XML Import Log", "import_datetime"):
-        rename_field("XML Import Log", "import_date", "import_datetime")
+    if assignments:
+        frappe.db.sql(f"""
+            UPDATE `tabXML Import Log`
+            SET {", ".join(assignments)}
+        """)
 
     frappe.db.commit()
@@ -4,10 +4,16 @@ These functions are called by Frappe's scheduler hooks
 """
 
 import frappe
-from .item_importer import XMLItemImporter
+from .item_importer import XMLItemImporter, get_notification_recipients
 from frappe.utils import now_datetime, add_to_date, cint
 import requests
 
+# Cache key of the settings dict, also cleared by XML Item Import Settings on update
+SETTINGS_CACHE_KEY = "xml_import_settings"
+
+# Seconds the settings stay cached
+SETTINGS_CACHE_TTL = 300
+
 def scheduled_xml_import():
     """
     Main scheduled function called by Frappe scheduler
@@ -26,22 +32,26 @@ def scheduled_xml_import():
             frappe.logger().error("No XML feed URL configured")
             return
 
-        # Check if feed has changed (if checking is enabled)
+        # Check if feed has changed (if checking is enabled); the response of the
+        # conditional GET is imported directly instead of downloading the feed again
+        response = None
         if settings.get('check_feed_changes', True):
-            if not has_feed_changed(xml_url, settings):
+            changed, response = fetch_feed_if_changed(xml_url, settings)
+            if not changed:
                 frappe.logger().info("XML feed has not changed, skipping import")
                 return
 
         # Run the import
         company = settings.get('company') or frappe.defaults.get_global_default("company")
         importer = XMLItemImporter(xml_url, company)
-        result = importer.import_from_xml()
+        result = importer.import_from_xml(response)
 
         # Log the import result
         log_import_result(result, xml_url)
 
         # Update last import timestamp
         update_last_import_time()
+        frappe.db.commit()
 
         frappe.logger().info(f"Scheduled XML import completed: {result}")
 
@@ -53,7 +63,17 @@ def scheduled_xml_import():
         send_error_notification(error_msg)
 
 def get_xml_import_settings():
-    """Get XML import settings from Site Config or default values"""
+    """Get XML import settings from Site Config or default values, cached for a few minutes"""
+    cached = frappe.cache().get_value(SETTINGS_CACHE_KEY)
+    if cached:
+        return cached
+
+    settings = load_xml_import_settings()
+    frappe.cache().set_value(SETTINGS_CACHE_KEY, settings, expires_in_sec=SETTINGS_CACHE_TTL)
+    return settings
+
+def load_xml_import_settings():
+    """Read XML import settings from the Settings doctype or Site Config"""
     try:
         settings = frappe.get_single("XML Item Import Settings")
         return {
@@ -76,31 +96,45 @@ def get_xml_import_settings():
             'import_frequency': 'Daily'
         })
 
-def has_feed_changed(xml_url, settings):
+def fetch_feed_if_changed(xml_url, settings):
     """
     Check if XML feed has changed since last import
-    Uses HTTP headers (ETag, Last-Modified) and content hash
+    Uses a conditional GET (ETag, Last-Modified) and the content size
+
+    Returns:
+        tuple: (changed, response) - response is the open streamed GET response
+        when the feed changed, or None when it did not or could not be fetched
     """
+    response = None
     try:
-        # Make HEAD request to check headers
-        response = requests.head(xml_url, timeout=30)
+        last_etag = settings.get('last_etag')
+        last_modified = settings.get('last_modified')
+
+        # The server answers 304 without a body when the feed is unchanged
+        headers = {}
+        if last_etag:
+            headers['If-None-Match'] = last_etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        response = requests.get(xml_url, headers=headers, stream=True, timeout=30)
+        if response.status_code == 304:
+            response.close()
+            return False, None
         response.raise_for_status()
 
-        # Check ETag
+        # Servers that ignore conditional headers: compare them ourselves
         current_etag = response.headers.get('ETag')
-        last_etag = settings.get('last_etag')
-
         if current_etag and last_etag:
             if current_etag == last_etag:
-                return False
+                response.close()
+                return False, None
 
-        # Check Last-Modified
         current_modified = response.headers.get('Last-Modified')
-        last_modified = settings.get('last_modified')
-
         if current_modified and last_modified:
             if current_modified == last_modified:
-                return False
+                response.close()
+                return False, None
 
         # If no reliable headers, check content size
         content_length = response.headers.get('Content-Length')
@@ -114,30 +148,37 @@ def has_feed_changed(xml_url, settings):
                 if last_import:
                     hours_since_import = (now_datetime() - last_import).total_seconds() / 3600
                     if hours_since_import < 1:  # Less than 1 hour
-                        return False
+                        response.close()
+                        return False, None
 
         # Update stored values for next check
         update_feed_metadata(current_etag, current_modified, content_length)
 
-        return True
+        return True, response
 
     except Exception as e:
         frappe.log_error(f"Error checking feed changes: {str(e)}")
-        # On error, assume feed changed to be safe
-        return True
+        if response is not None:
+            response.close()
+        # On error, assume feed changed to be safe; the importer fetches the feed itself
+        return True, None
 
 def update_feed_metadata(etag, last_modified, content_length):
-    """Update stored feed metadata"""
+    """Update stored feed metadata (committed with the rest of the scheduled run)"""
     try:
-        settings = frappe.get_single("XML Import Settings")
+        values = {}
         if etag:
-            settings.last_etag = etag
+            values['last_etag'] = etag
         if last_modified:
-            settings.last_modified = last_modified
+            values['last_modified'] = last_modified
         if content_length:
-            settings.last_content_size = int(content_length)
-        settings.save(ignore_permissions=True)
-        frappe.db.commit()
+            values['last_content_size'] = int(content_length)
+        if not values:
+            return
+
+        # Direct update of the Single's values, without loading and validating the document
+        frappe.db.set_value("XML Import Settings", None, values, update_modified=False)
+        frappe.cache().delete_key(SETTINGS_CACHE_KEY)
     except Exception as e:
         frappe.log_error(f"Failed to update feed metadata: {str(e)}")
 
@@ -161,12 +202,10 @@ def log_import_result(result, xml_url):
         frappe.log_error(f"Failed to log import result: {str(e)}")
 
 def update_last_import_time():
-    """Update last import timestamp"""
+    """Update last import timestamp (committed with the rest of the run)"""
     try:
-        settings = frappe.get_single("XML Import Settings")
-        settings.last_import = now_datetime()
-        settings.save(ignore_permissions=True)
-        frappe.db.commit()
+        frappe.db.set_value("XML Import Settings", None, "last_import", now_datetime(), update_modified=False)
+        frappe.cache().delete_key(SETTINGS_CACHE_KEY)
     except Exception as e:
         frappe.log_error(f"Failed to update last import time: {str(e)}")
 
@@ -174,14 +213,14 @@ def send_error_notification(error_msg):
     """Send error notification to configured users"""
     try:
         settings = frappe.get_single("XML Import Settings")
-        notification_emails = settings.get('notification_emails', '')
+        recipients = get_notification_recipients(settings.get('notification_emails', ''))
 
-        if not notification_emails:
+        if not recipients:
             return
 
-        # Send email notification
+        # Queue email notification instead of sending it inline
         frappe.sendmail(
-            recipients=notification_emails.split(','),
+            recipients=recipients,
             subject="XML Import Error",
             message=f"""
             <p>An error occurred during the scheduled XML import:</p>
@@ -189,7 +228,7 @@ def send_error_notification(error_msg):
             <p><strong>Time:</strong> {now_datetime()}</p>
             <p>Please check the Error Log for more details.</p>
             """,
-            now=True
+            now=False
         )
     except Exception as e:
         frappe.log_error(f"Failed to send error notification: {str(e)}")
@@ -223,6 +262,7 @@ def manual_xml_import(xml_source=None, company=None):
 
         if result.get('success'):
             update_last_import_time()
+            frappe.db.commit()
 
         return result
 
@@ -243,21 +283,20 @@ def validate_xml_feed(xml_url):
     """
     try:
         importer = XMLItemImporter(xml_url)
-        xml_content = importer.fetch_xml_content()
-        root = importer.parse_xml(xml_content)
-
-        # Count elements
-        shopitems = root.findall('.//SHOPITEM')
 
-        # Sample first item for structure validation
+        # Count elements while streaming, sampling the first item for structure validation
+        item_count = 0
         sample_data = None
-        if shopitems:
-            sample_data = importer.parse_shop_item(shopitems[0])
+        with importer.open_xml_stream() as stream:
+            for shopitem in importer.iter_shop_items(stream):
+                if not item_count:
+                    sample_data = importer.parse_shop_item(shopitem)
+                item_count += 1
 
         return {
             "success": True,
-            "total_items": len(shopitems),
-            "root_element": root.tag,
+            "total_items": item_count,
+            "root_element": importer.feed_root_tag,
             "sample_item": sample_data,
             "valid": True
         }